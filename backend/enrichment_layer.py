@@ -1,5 +1,7 @@
 # enrichment_model.py
-from typing import Dict, List, Set, Any, Tuple
+import sys
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
 
 # --------- Options (spec-aligned) ----------
 STATUS_OPTIONS = [
@@ -34,46 +36,44 @@ SYSTEMIC_OPTIONS = [
 # --------- Abutment collection (pure) ----------
 def gather_abutment_teeth(spans: Dict[str, List[Dict]]) -> List[str]:
     """Collect unique abutment-related teeth from span detector output."""
-    abuts: List[str] = []
-    for _, recs in spans.items():
+    # dict keys de-duplicate while preserving first-seen order (single pass)
+    out: Dict[str, None] = {}
+    for recs in spans.values():
         for r in recs:
-            a = r.get("abutments", {})
-            o = r.get("outside_abutments", {})
-            if a.get("mesial"): abuts.append(a["mesial"])
-            if a.get("distal"): abuts.append(a["distal"])
-            if o.get("left"):   abuts.append(o["left"])
-            if o.get("right"):  abuts.append(o["right"])
-            for p in r.get("pier_abutments", []):
-                abuts.append(p)
-    # de-duplicate preserve order
-    seen: Set[str] = set()
-    out: List[str] = []
-    for t in abuts:
-        if t and t not in seen:
-            seen.add(t)
-            out.append(t)
-    return out
+            a = r.get("abutments") or {}
+            o = r.get("outside_abutments") or {}
+            for t in (a.get("mesial"), a.get("distal"), o.get("left"), o.get("right"),
+                      *r.get("pier_abutments", ())):
+                if t:
+                    out[t] = None
+    return list(out)
 
 # --------- Key conventions (no UI) ----------
+@lru_cache(maxsize=64)  # FDI namespace is 32 teeth; cache saturates immediately
 def abutment_keys(tooth: str) -> Dict[str, str]:
-    """Return the Streamlit key names this tooth will use (but do not render)."""
+    """Return the Streamlit key names this tooth will use (but do not render). Read-only (cached)."""
+    # Interned so repeated session_state lookups hit the identity fast path
     prefix = f"abut_{tooth}"
     return {
-        "status": f"{prefix}_status",
-        "mobility": f"{prefix}_mob",
-        "crr": f"{prefix}_crr",
-        "enamel": f"{prefix}_enamel",
+        "status": sys.intern(f"{prefix}_status"),
+        "mobility": sys.intern(f"{prefix}_mob"),
+        "crr": sys.intern(f"{prefix}_crr"),
+        "enamel": sys.intern(f"{prefix}_enamel"),
     }
 
-def risk_keys() -> Dict[str, str]:
-    return {
-        "caries": "risk_caries",
-        "occlusion": "risk_occl",
-        "parafunction": "risk_para",
-        "opposing": "risk_opp",
-        # systemic flags are multiple checkboxes; we’ll namespace them
-        "systemic_prefix": "risk_systemic",
-    }
+RISK_KEYS: Dict[str, str] = {
+    "caries": "risk_caries",
+    "occlusion": "risk_occl",
+    "parafunction": "risk_para",
+    "opposing": "risk_opp",
+    # systemic flags are multiple checkboxes; we’ll namespace them
+    "systemic_prefix": "risk_systemic",
+}
+
+# (flag value, session key) for every systemic checkbox, formatted once
+_SYSTEMIC_ITEMS: Tuple[Tuple[str, str], ...] = tuple(
+    (val, f"{RISK_KEYS['systemic_prefix']}_{val}") for val, _label in SYSTEMIC_OPTIONS
+)
 
 # --------- Defaults you can use in main UI ----------
 DEFAULTS = {
@@ -99,38 +99,29 @@ def serialize_case_payload(
     Read values (by keys) from Streamlit session_state to produce a case payload.
     This function is pure and UI-agnostic; it just looks up keys/namespaces.
     """
-    # patient risk
-    rk = risk_keys()
-    systemic_selected: List[str] = []
-    # collect all SYSTEMIC_OPTIONS toggles
-    for val, _label in SYSTEMIC_OPTIONS:
-        key = f"{rk['systemic_prefix']}_{val}"
-        if session_state.get(key, False):
-            systemic_selected.append(val)
-
-    patient_risk = {
-        "caries_risk": session_state.get(rk["caries"], DEFAULTS["caries"]),
-        "occlusal_scheme": session_state.get(rk["occlusion"], DEFAULTS["occlusion"]),
-        "parafunction": session_state.get(rk["parafunction"], DEFAULTS["parafunction"]),
-        "opposing_dentition": session_state.get(rk["opposing"], DEFAULTS["opposing"]),
-        "systemic_flags": systemic_selected,
-    }
-
-    # abutments
-    abutment_health: List[Dict[str, Any]] = []
-    for tooth in abutment_teeth:
-        ak = abutment_keys(tooth)
-        abutment_health.append({
-            "tooth": tooth,
-            "status": session_state.get(ak["status"], DEFAULTS["status"]),
-            "mobility_miller": session_state.get(ak["mobility"], DEFAULTS["mobility"]),
-            "crown_root_ratio": session_state.get(ak["crr"], DEFAULTS["crr"]),
-            "enamel_ok_for_rbb": bool(session_state.get(ak["enamel"], DEFAULTS["enamel"])),
-        })
-
+    get = session_state.get
+    rk = RISK_KEYS
+    d = DEFAULTS
     return {
         "missing": list(missing),
         "spans": spans,
-        "patient_risk": patient_risk,
-        "abutment_health": abutment_health,
+        "patient_risk": {
+            "caries_risk": get(rk["caries"], d["caries"]),
+            "occlusal_scheme": get(rk["occlusion"], d["occlusion"]),
+            "parafunction": get(rk["parafunction"], d["parafunction"]),
+            "opposing_dentition": get(rk["opposing"], d["opposing"]),
+            # all SYSTEMIC_OPTIONS toggles that are set
+            "systemic_flags": [val for val, key in _SYSTEMIC_ITEMS if get(key, False)],
+        },
+        "abutment_health": [
+            {
+                "tooth": tooth,
+                "status": get(ak["status"], d["status"]),
+                "mobility_miller": get(ak["mobility"], d["mobility"]),
+                "crown_root_ratio": get(ak["crr"], d["crr"]),
+                "enamel_ok_for_rbb": bool(get(ak["enamel"], d["enamel"])),
+            }
+            for tooth in abutment_teeth
+            for ak in (abutment_keys(tooth),)
+        ],
     }
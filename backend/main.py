@@ -1,10 +1,16 @@
 # main.py
-from typing import List, Dict, Any
-from fastapi import FastAPI, HTTPException
+import copy
+import hashlib
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Union
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 import logging
-from ontology_layer import get_ontology
+import os
+import orjson
+from ontology_layer import get_ontology_json
 from rules_engine import ENGINE_VERSION, RULESET_VERSION  # (already present via ontology_layer but ok to import)
 
 
@@ -16,10 +22,10 @@ from enrichment_layer import (
     CARIES_OPTIONS, OCCLUSION_OPTIONS, PARA_OPTIONS,
     OPPOSING_OPTIONS, SYSTEMIC_OPTIONS,
 )
-from rules_engine import run_engine
+from rules_engine import _cached_run_engine
 
 class SpansRequest(BaseModel):
-    missing: List[str] = Field(default_factory=list)
+    missing: List[Union[str, int]] = Field(default_factory=list)
 
 class AbutmentHealth(BaseModel):
     tooth: str
@@ -36,73 +42,124 @@ class PatientRisk(BaseModel):
     systemic_flags: List[str] = Field(default_factory=list)
 
 class PlanRequest(BaseModel):
-    missing: List[str]
+    missing: List[Union[str, int]]
     abutment_health: List[AbutmentHealth] = Field(default_factory=list)
     patient_risk: PatientRisk
 
-app = FastAPI(title="Prostho CDSS API", version="0.1.0")
+app = FastAPI(title="Prostho CDSS API", version="0.1.0", default_response_class=ORJSONResponse)
+
+# Explicit origin allowlist. Defaults cover local dev (any port) and Codespaces
+# forwarded ports; override via env. The API uses no cookies or auth headers, so
+# credentials stay disabled (any *.app.github.dev origin matches the default).
+CORS_ORIGIN_REGEX = os.environ.get(
+    "CDSS_CORS_ORIGIN_REGEX",
+    r"^https?://((localhost|127\.0\.0\.1)(:\d+)?|[a-z0-9-]+\.app\.github\.dev)$",
+)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=[],
+    allow_origin_regex=CORS_ORIGIN_REGEX,
+    allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
 log = logging.getLogger("cdss")
 logging.basicConfig(level=logging.INFO)
+log.setLevel(logging.WARNING)
+
+# Domain errors from span detection / the rules engine are client errors (400).
+# Anything else propagates as a genuine 500.
+@app.exception_handler(ValueError)
+async def value_error_handler(request: Request, exc: ValueError) -> ORJSONResponse:
+    log.warning("%s %s rejected: %s", request.method, request.url.path, exc)
+    return ORJSONResponse({"detail": str(exc)}, status_code=400)
+
+def _missing_key(missing: List[Union[str, int]]) -> Tuple[str, ...]:
+    """
+    Canonical, hashable form of a missing-teeth list: FDI codes as strings
+    (ints accepted), whitespace-stripped, de-duplicated and sorted.
+    Span detection is insensitive to order/duplicates, so equivalent
+    requests share cache entries.
+    """
+    return tuple(sorted(frozenset(str(t).strip() for t in missing)))
+
+@lru_cache(maxsize=256)
+def _detect_spans_memo(missing_key: Tuple[str, ...]) -> Dict[str, List[Dict]]:
+    """Span detection memoized on _missing_key(); the result is shared, so never hand it out."""
+    return detect_spans_and_abutments(list(missing_key))
+
+def _spans_cached(missing_key: Tuple[str, ...]) -> Dict[str, List[Dict]]:
+    """Memoized span detection; each caller gets its own copy, so the cache can't be mutated."""
+    return copy.deepcopy(_detect_spans_memo(missing_key))
 
 @app.get("/health")
 def health() -> Dict[str, Any]:
     return {"ok": True}
 
+# ---- Static payloads: encoded once, served as raw bytes ----
+STATIC_CACHE_CONTROL = "public, max-age=86400, immutable"
+
+@lru_cache(maxsize=4)
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison per RFC 9110 (If-None-Match may list several tags or '*')."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(t.strip().removeprefix("W/") == etag for t in if_none_match.split(","))
+
+def _static_json(request: Request, body: bytes) -> Response:
+    etag = _etag(body)
+    headers = {"ETag": etag, "Cache-Control": STATIC_CACHE_CONTROL}
+    inm = request.headers.get("if-none-match")
+    if inm and _etag_matches(inm, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+_ENUMS_JSON = orjson.dumps({
+    "status_options": STATUS_OPTIONS,
+    "mobility_options": MOBILITY_OPTIONS,
+    "crr_options": CRR_OPTIONS,
+    "caries_options": CARIES_OPTIONS,
+    "occlusion_options": OCCLUSION_OPTIONS,
+    "parafunction_options": PARA_OPTIONS,
+    "opposing_options": OPPOSING_OPTIONS,
+    "systemic_options": SYSTEMIC_OPTIONS,
+})
+
 @app.get("/enums")
-def get_enums() -> Dict[str, Any]:
-    return {
-        "status_options": STATUS_OPTIONS,
-        "mobility_options": MOBILITY_OPTIONS,
-        "crr_options": CRR_OPTIONS,
-        "caries_options": CARIES_OPTIONS,
-        "occlusion_options": OCCLUSION_OPTIONS,
-        "parafunction_options": PARA_OPTIONS,
-        "opposing_options": OPPOSING_OPTIONS,
-        "systemic_options": SYSTEMIC_OPTIONS,
-    }
+def get_enums(request: Request) -> Response:
+    return _static_json(request, _ENUMS_JSON)
 
 @app.post("/api/spans")
 def api_spans(req: SpansRequest) -> Dict[str, Any]:
-    try:
-        # Use missing exactly as provided (third molars included)
-        missing = [str(t) for t in req.missing]
-        spans = detect_spans_and_abutments(missing)
-        abuts = gather_abutment_teeth(spans)
-        return {"spans": spans, "abutments": abuts}
-    except Exception as e:
-        log.exception("Span detection failed")
-        raise HTTPException(status_code=400, detail=f"Span detection failed: {e}")
+    # Use missing as provided (third molars included)
+    spans = _spans_cached(_missing_key(req.missing))
+    abuts = gather_abutment_teeth(spans)
+    return {"spans": spans, "abutments": abuts}
 
 @app.post("/api/plan")
 def api_plan(req: PlanRequest) -> Dict[str, Any]:
-    try:
-        # Include 8s; restoration rules handle any clinical exclusions
-        missing = [str(t) for t in req.missing]
-        spans = detect_spans_and_abutments(missing)
-
-        abut_health = [a.model_dump() for a in req.abutment_health]
-        patient_risk = req.patient_risk.model_dump()
-
-        payload = {
-            "missing": missing,
-            "spans": spans,
-            "patient_risk": patient_risk,
-            "abutment_health": abut_health,
-        }
-        return run_engine(payload)
-    except Exception as e:
-        log.exception("Engine failed")
-        raise HTTPException(status_code=400, detail=f"Engine failed: {e}")
-    
+    # Include 8s; restoration rules handle any clinical exclusions
+    missing_key = _missing_key(req.missing)
+    spans = _spans_cached(missing_key)
+
+    # One serializer pass over the request instead of one per sub-model
+    dumped = req.model_dump(exclude={"missing"})
+
+    payload = {
+        "missing": list(missing_key),
+        "spans": spans,
+        "patient_risk": dumped["patient_risk"],
+        "abutment_health": dumped["abutment_health"],
+    }
+    # Shared cache entry: safe because the response is serialized immediately
+    return _cached_run_engine(payload)
+
 @app.get("/api/ontology")
-def get_ontology_api():
-    return get_ontology()
+def get_ontology_api(request: Request) -> Response:
+    # Pre-encoded bytes: skips jsonable_encoder over the nested ontology dict
+    return _static_json(request, get_ontology_json())
@@ -1,82 +1,118 @@
 # rules_cards.py
-from typing import Dict, List, Any, Literal, TypedDict, Optional
+from itertools import repeat
+from typing import Dict, List, Any, Literal, TypedDict, Optional, FrozenSet, Tuple
 from rules_scoring import OptionCard, Family, Kind, SpanType, Arch
 
-VALID_FAMILIES: set[Family] = {"fixed", "removable", "implant"}
-VALID_KINDS: set[Kind] = {"fdp", "cantilever", "rbb", "implant_single", "implant_fdp", "rpd"}
-VALID_SPANTYPES: set[SpanType] = {"BOUNDED", "DISTAL_EXTENSION"}
-VALID_ARCHES: set[Arch] = {"maxilla", "mandible"}
+VALID_FAMILIES: FrozenSet[Family] = frozenset({"fixed", "removable", "implant"})
+VALID_KINDS: FrozenSet[Kind] = frozenset({"fdp", "cantilever", "rbb", "implant_single", "implant_fdp", "rpd"})
+VALID_SPANTYPES: FrozenSet[SpanType] = frozenset({"BOUNDED", "DISTAL_EXTENSION"})
+VALID_ARCHES: FrozenSet[Arch] = frozenset({"maxilla", "mandible"})
+
+def _str_list(val: Any) -> List[str]:
+    """Return `val` if it is a list of strings, else a fresh empty list."""
+    # Empty is the common case; otherwise a single C-level type scan (no generator frame)
+    if not val:
+        return []
+    if isinstance(val, list) and all(map(isinstance, val, repeat(str))):
+        return val
+    return []
+
+def _raw_hits(card: Dict[str, Any]) -> Tuple[Any, Any]:
+    """
+    (absolute, relative) hits as given: the flat EvaluatorCard lists, or the
+    nested OptionCard `rule_hits` dict for cards built elsewhere.
+    """
+    if "absolute_hits" in card:
+        return card["absolute_hits"], card.get("relative_hits")
+    rh = card.get("rule_hits") or {}
+    return rh.get("absolute"), rh.get("relative")
 
 def validate_option_card(card: Dict[str, Any], span_context: Dict[str, Any]) -> OptionCard:
     """Normalize/validate a single evaluator-produced card against the SpanContext."""
-    out: Dict[str, Any] = dict(card)  # shallow copy
+    return _normalize_card(card, span_context["arch"], span_context["span_type"], span_context.get("length"))
 
+# Fields _normalize_card rebuilds itself; anything else on a card is carried through
+_CARD_FIELDS: FrozenSet[str] = frozenset({
+    "option_id", "family", "kind", "span_id", "arch", "span_type", "length",
+    "rule_hits", "absolute_hits", "relative_hits", "meta", "rank_score",
+})
+
+def _normalize_card(card: Dict[str, Any], arch: Arch, span_type: SpanType, ctx_length: Any) -> OptionCard:
+    """validate_option_card with the SpanContext fields already unpacked by the caller."""
     # Required string fields
     for field in ("option_id", "span_id"):
-        val = out.get(field)
+        val = card.get(field)
         if not isinstance(val, str) or not val.strip():
             raise ValueError(f"OptionCard missing/invalid '{field}'")
 
     # Enums
-    fam = out.get("family")
+    fam = card.get("family")
     if fam not in VALID_FAMILIES:
         raise ValueError(f"OptionCard invalid family: {fam}")
 
-    kind = out.get("kind")
+    kind = card.get("kind")
     if kind not in VALID_KINDS:
         raise ValueError(f"OptionCard invalid kind: {kind}")
 
-    # Span identity must match context
-    out["arch"] = span_context["arch"]
-    out["span_type"] = span_context["span_type"]
-
     # Length
-    length = out.get("length", span_context.get("length"))
+    length = card.get("length", ctx_length)
     if not isinstance(length, int) or length < 0:
         raise ValueError("OptionCard missing/invalid 'length'")
-    out["length"] = length
-
-    # rule_hits normalization
-    rh = out.get("rule_hits") or {}
-    abs_hits = rh.get("absolute") or []
-    rel_hits = rh.get("relative") or []
-    if not isinstance(abs_hits, list) or not all(isinstance(x, str) for x in abs_hits):
-        abs_hits = []
-    if not isinstance(rel_hits, list) or not all(isinstance(x, str) for x in rel_hits):
-        rel_hits = []
+
+    # rule_hits normalization (flat evaluator lists are folded back into rule_hits)
+    raw_abs, raw_rel = _raw_hits(card)
+    abs_hits = _str_list(raw_abs)
     # de-dup relative (absolute kept as-is)
-    rel_hits = list(dict.fromkeys(rel_hits))
-    out["rule_hits"] = {"absolute": abs_hits, "relative": rel_hits}
+    rel_hits = list(dict.fromkeys(_str_list(raw_rel)))
 
     # meta dict
-    meta = out.get("meta") or {}
+    meta = card.get("meta") or {}
     if not isinstance(meta, dict):
         meta = {}
-    out["meta"] = meta
 
-    # Guard: evaluators must not pre-fill rank_score
-    out.pop("rank_score", None)
+    # Span identity (arch/span_type) comes from the context; rank_score is
+    # never copied (evaluators must not pre-fill it).
+    out: Dict[str, Any] = {
+        "option_id": card["option_id"],
+        "family": fam,
+        "kind": kind,
+        "span_id": card["span_id"],
+        "arch": arch,
+        "span_type": span_type,
+        "length": length,
+        "rule_hits": {"absolute": abs_hits, "relative": rel_hits},
+        "meta": meta,
+    }
+    if not card.keys() <= _CARD_FIELDS:
+        for k, v in card.items():
+            if k not in _CARD_FIELDS:
+                out[k] = v
 
     return out  # type: ignore[return-value]
 
 def prepare_cards_for_scoring(cards: List[Dict[str, Any]], span_context: Dict[str, Any]):
     """
     Validate/normalize all cards for a span and FILTER OUT absolute-hit cards.
+    Absolute hits are peeked first, so only kept cards pay for full validation.
     Returns (kept_cards, discarded_cards).
     """
     kept: List[OptionCard] = []
     discarded: List[Dict[str, Any]] = []
 
+    arch = span_context["arch"]
+    span_type = span_context["span_type"]
+    ctx_length = span_context.get("length")
+
     for c in cards:
-        oc = validate_option_card(c, span_context)
-        if oc["rule_hits"]["absolute"]:
+        abs_hits = _str_list(_raw_hits(c)[0])
+        if abs_hits:
             discarded.append({
-                "option_id": oc["option_id"],
-                "span_id": oc["span_id"],
-                "absolute": oc["rule_hits"]["absolute"],
+                "option_id": c.get("option_id"),
+                "span_id": c.get("span_id"),
+                "absolute": abs_hits,
             })
             continue
-        kept.append(oc)
+        kept.append(_normalize_card(c, arch, span_type, ctx_length))
 
     return kept, discarded
 
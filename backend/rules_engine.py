@@ -1,15 +1,23 @@
 # rules_engine.py
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple, Optional, Callable
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Any, Dict, List, Tuple, Optional, Callable, FrozenSet, NamedTuple
+
+import orjson
 
 # ---- Internal deps (your existing files) ----
 from rules_validation import validate_case_payload
-from rules_utils import build_abutment_health_map, kennedy_class_for_arch
+from rules_utils import build_abutment_health_map, build_abutment_features, kennedy_class_for_arch
 from rules_cards import prepare_cards_for_scoring
 from rules_scoring import (
     sort_options,
     RELATIVE_RULES,
     SCORING_POLICY_ID,
+    EvaluatorCard,
     OptionCard,
 )
 from rules_evaluators import (
@@ -19,6 +27,8 @@ from rules_evaluators import (
     eval_implant_fdp,
     eval_rbb,
     eval_cantilever,
+    implant_contraindication_record,
+    risk_flags,
 )
 
 # --------------------------
@@ -27,17 +37,20 @@ from rules_evaluators import (
 ENGINE_VERSION = "0.2.3"
 RULESET_VERSION = "mvp-2025-09-06"
 
+# RELATIVE_RULES is a module constant; sort it once for the provenance snapshot
+_RELATIVE_RULES_SNAPSHOT: Tuple[str, ...] = tuple(sorted(RELATIVE_RULES))
+
 # --------------------------
 # Capabilities (E1) policy
 # --------------------------
+_HARD_STOPS: FrozenSet[str] = frozenset({
+    "uncontrolled_diabetes",
+    "recent_head_neck_radiation",
+    "high_risk_antiresorptives",
+})
+
 def compute_implant_capabilities(patient_risk: Dict[str, Any]) -> Dict[str, Any]:
-    flags = set(patient_risk.get("systemic_flags", []))
-    hard_stops = {
-        "uncontrolled_diabetes",
-        "recent_head_neck_radiation",
-        "high_risk_antiresorptives",
-    }
-    blocked = bool(flags & hard_stops)
+    blocked = not _HARD_STOPS.isdisjoint(patient_risk.get("systemic_flags", []))
     return {
         "implants_allowed": not blocked,
         "why": (["E1_ImplantContraindication"] if blocked else []),
@@ -46,77 +59,203 @@ def compute_implant_capabilities(patient_risk: Dict[str, Any]) -> Dict[str, Any]
 # --------------------------
 # SpanContext builder
 # --------------------------
+_SPAN_REQUIRED_KEYS: Tuple[str, ...] = (
+    "span_id",
+    "arch",
+    "span_type",
+    "length",
+    "missing_teeth",
+    "abutments",
+    "cross_midline",
+    "pier_abutments",
+    "pontic_tooth",
+)
+_SPAN_REQUIRED_KEYSET: FrozenSet[str] = frozenset(_SPAN_REQUIRED_KEYS)
+_NO_OUTSIDE_ABUTMENTS: Dict[str, Any] = {}
+
 def build_span_context(span: Dict[str, Any]) -> Dict[str, Any]:
-    required = [
-        "span_id",
-        "arch",
-        "span_type",
-        "length",
-        "missing_teeth",
-        "abutments",
-        "cross_midline",
-        "pier_abutments",
-        "pontic_tooth",
-    ]
-    for k in required:
-        if k not in span:
-            raise KeyError(f"NormalizedSpan missing '{k}'")
+    # Evaluators only read the context, so nested lists/dicts are shared with
+    # the normalized span rather than copied. Scalars are coerced once here
+    # (length -> int, pontic_tooth -> str, missing_teeth -> str frozenset)
+    # so evaluators can use them as-is.
+    if not _SPAN_REQUIRED_KEYSET <= span.keys():
+        k = next(k for k in _SPAN_REQUIRED_KEYS if k not in span)
+        raise KeyError(f"NormalizedSpan missing '{k}'")
 
     return {
         "span_id": span["span_id"],
         "arch": span["arch"],
         "span_type": span["span_type"],
         "length": int(span["length"]),
-        "missing_teeth": list(span["missing_teeth"]),
-        "abutments": dict(span["abutments"]),
+        "missing_teeth": span["missing_teeth"],
+        "missing_teeth_set": frozenset(map(str, span["missing_teeth"])),
+        "abutments": span["abutments"],
         "cross_midline": bool(span["cross_midline"]),
-        "pier_abutments": list(span.get("pier_abutments", [])),
-        "pontic_tooth": span.get("pontic_tooth"),
-        "outside_abutments": dict(span.get("outside_abutments", {})),
+        "pier_abutments": span["pier_abutments"],
+        "pontic_tooth": (str(span["pontic_tooth"]) if span["pontic_tooth"] is not None else None),
+        "outside_abutments": span.get("outside_abutments", _NO_OUTSIDE_ABUTMENTS),
     }
 
 # --------------------------
 # Case plan composition
 # --------------------------
-def _select_top(
+def _index_top_cards(
     cards: List[OptionCard],
-    predicate: Optional[Callable[[OptionCard], bool]] = None,
-) -> Optional[OptionCard]:
-    if predicate is None:
-        return cards[0] if cards else None
+) -> Tuple[Dict[str, OptionCard], Dict[Tuple[str, str], OptionCard]]:
+    """
+    Single pass over a span's ranked cards: first (= best ranked) card per
+    family and per (family, kind).
+    """
+    by_family: Dict[str, OptionCard] = {}
+    by_family_kind: Dict[Tuple[str, str], OptionCard] = {}
     for c in cards:
-        if predicate(c):
-            return c
-    return None
+        by_family.setdefault(c["family"], c)
+        by_family_kind.setdefault((c["family"], c["kind"]), c)
+    return by_family, by_family_kind
+
+class _PlanState(NamedTuple):
+    """Per-case lookups shared by the plan choosers."""
+    top_by_family: Dict[str, Dict[str, OptionCard]]
+    top_by_family_kind: Dict[str, Dict[Tuple[str, str], OptionCard]]
+    top_overall: Dict[str, Optional[OptionCard]]
+    implants_allowed: bool
+
+_Chooser = Callable[[str, Dict[str, Any], _PlanState], Optional[OptionCard]]
+
+def _plan_total_and_selected(
+    chooser: _Chooser,
+    span_options: Dict[str, List[OptionCard]],
+    span_map: Dict[str, Dict[str, Any]],
+    st: _PlanState,
+) -> Tuple[int, Dict[str, str], List[OptionCard]]:
+    """(total score, span_id -> option_id, chosen cards); total is -1 if any span has no choice."""
+    total = 0
+    selected_map: Dict[str, str] = {}
+    picks: List[OptionCard] = []
+    for sid in span_options:
+        choice = chooser(sid, span_map[sid], st)
+        if choice is None:
+            return -1, {}, []
+        total += int(choice.get("rank_score", 0))
+        selected_map[sid] = choice["option_id"]
+        picks.append(choice)
+    return total, selected_map, picks
+
+# --- Plan: UnifiedRPD ---
+def _chooser_unified_rpd(span_id: str, span: Dict[str, Any], st: _PlanState) -> Optional[OptionCard]:
+    return st.top_by_family_kind[span_id].get(("removable", "rpd"))
+
+# --- Plan: UnifiedFDP ---
+def _chooser_unified_fdp(span_id: str, span: Dict[str, Any], st: _PlanState) -> Optional[OptionCard]:
+    # Require conventional fixed bridges on *all* spans
+    return st.top_by_family_kind[span_id].get(("fixed", "fdp"))
+
+# --- Plan: ImplantConversionThenFixed (DE only) ---
+def _chooser_implant_conversion(span_id: str, span: Dict[str, Any], st: _PlanState) -> Optional[OptionCard]:
+    tops = st.top_by_family[span_id]
+    if span["span_type"] == "DISTAL_EXTENSION":
+        return tops.get("implant")
+    return tops.get("fixed") or tops.get("implant")
+
+# --- Plan: Mixed_FDP_RPD ---
+# Intention: explicitly propose an RPD + FDP combination even when implants
+# are available (e.g., DE spans). We bias RPD on distal-extensions and FDP
+# on bounded spans. We never select implants in this plan.
+def _chooser_mixed_fdp_rpd(span_id: str, span: Dict[str, Any], st: _PlanState) -> Optional[OptionCard]:
+    rpd = st.top_by_family_kind[span_id].get(("removable", "rpd"))
+    fixed = st.top_by_family[span_id].get("fixed")
+    if span["span_type"] == "DISTAL_EXTENSION":
+        # Prefer removable (RPD) for DE spans; if no RPD exists, try fixed bridge.
+        pick = rpd or fixed
+    else:
+        # Non-DE spans: prefer fixed bridges (FDP). If none, fall back to RPD.
+        pick = fixed or rpd
+    return pick
+
+# --- Plan: PierResolution_ImplantPlusFixed ---
+def _chooser_pier_resolution(span_id: str, span: Dict[str, Any], st: _PlanState) -> Optional[OptionCard]:
+    tops = st.top_by_family[span_id]
+    is_pier = bool(span.get("pier_abutments"))
+    if is_pier and span["span_type"] == "BOUNDED" and span["length"] == 1:
+        pick = tops.get("implant")
+        if pick:
+            return pick
+    return tops.get("fixed") or tops.get("implant") or st.top_overall[span_id]
+
+# --- Plan_ImplantOnEligibleSingles ---
+# Prefer implants on all single-tooth spans (length==1) where an implant option exists.
+def _chooser_implant_singles(span_id: str, span: Dict[str, Any], st: _PlanState) -> Optional[OptionCard]:
+    tops = st.top_by_family[span_id]
+    # If this span is single-tooth and an implant option exists, choose it
+    if st.implants_allowed and span["length"] == 1:
+        pick = tops.get("implant")
+        if pick:
+            return pick
+    # Otherwise: prefer fixed; then implant; then best available (keeps plan broadly feasible)
+    return tops.get("fixed") or tops.get("implant") or st.top_overall[span_id]
+
+class _SpanFlags(NamedTuple):
+    """Case-level feasibility predicates for the implant plans."""
+    has_distal_extension: bool
+    distal_extensions_implantable: bool
+    has_pier: bool
+    has_implantable_pier_short_span: bool
+    has_implantable_single_span: bool
+
+def _classify_spans(
+    span_options: Dict[str, List[OptionCard]],
+    span_map: Dict[str, Dict[str, Any]],
+    top_by_family: Dict[str, Dict[str, OptionCard]],
+) -> _SpanFlags:
+    """One pass over the spans yielding every plan feasibility predicate."""
+    has_de = False
+    de_implantable = True
+    has_pier = False
+    pier_short = False
+    single = False
+    for sid in span_options:
+        span = span_map[sid]
+        has_implant = "implant" in top_by_family[sid]
+        is_single = span["length"] == 1
+        if span["span_type"] == "DISTAL_EXTENSION":
+            has_de = True
+            if not has_implant:
+                de_implantable = False
+        if span.get("pier_abutments"):
+            has_pier = True
+            if span["span_type"] == "BOUNDED" and is_single and has_implant:
+                pier_short = True
+        if is_single and has_implant:
+            single = True
+    return _SpanFlags(has_de, de_implantable, has_pier, pier_short, single)
+
+# C-level key extraction (one call per plan, no Python lambda frame)
+_PLAN_SORT_KEY = itemgetter("total_score", "plan_id")
 
 def compose_case_plans(
     span_options: Dict[str, List[OptionCard]],
     capabilities: Dict[str, Any],
-    normalized_payload: Dict[str, Any],
+    span_map: Dict[str, Dict[str, Any]],
+    top_by_family: Optional[Dict[str, Dict[str, OptionCard]]] = None,
+    top_by_family_kind: Optional[Dict[str, Dict[Tuple[str, str], OptionCard]]] = None,
 ) -> List[Dict[str, Any]]:
     plans: List[Dict[str, Any]] = []
-    spans_linear: List[Dict[str, Any]] = normalized_payload["spans"]["maxilla"] + normalized_payload["spans"]["mandible"]
-    span_map = {s["span_id"]: s for s in spans_linear}
-
-    def plan_total_and_selected(
-        chooser: Callable[[str, List[OptionCard], Dict[str, Any]], Optional[OptionCard]]
-    ) -> Tuple[int, Dict[str, str], List[str]]:
-        total = 0
-        selected_map: Dict[str, str] = {}
-        rule_ids: List[str] = []
+
+    # Per-span best card by family / (family, kind) / overall (cards are already ranked)
+    if top_by_family is None or top_by_family_kind is None:
+        top_by_family, top_by_family_kind = {}, {}
         for sid, cards in span_options.items():
-            choice = chooser(sid, cards, span_map[sid])
-            if choice is None:
-                return -1, {}, []
-            total += int(choice.get("rank_score", 0))
-            selected_map[sid] = choice["option_id"]
-        return total, selected_map, rule_ids
+            top_by_family[sid], top_by_family_kind[sid] = _index_top_cards(cards)
+    implants_allowed = bool(capabilities.get("implants_allowed", False))
+    st = _PlanState(
+        top_by_family=top_by_family,
+        top_by_family_kind=top_by_family_kind,
+        top_overall={sid: (cards[0] if cards else None) for sid, cards in span_options.items()},
+        implants_allowed=implants_allowed,
+    )
 
     # --- Plan: UnifiedRPD ---
-    def chooser_unified_rpd(span_id: str, cards: List[OptionCard], span: Dict[str, Any]) -> Optional[OptionCard]:
-        return _select_top(cards, lambda c: c["family"] == "removable" and c["kind"] == "rpd")
-
-    total, selected, rules = plan_total_and_selected(chooser_unified_rpd)
+    total, selected, _ = _plan_total_and_selected(_chooser_unified_rpd, span_options, span_map, st)
     if total >= 0:
         plans.append({
             "plan_id": "Plan_UnifiedRPD",
@@ -125,41 +264,37 @@ def compose_case_plans(
             "plan_rule_hits": {"absolute": [], "relative": []},
         })
 
-        # --- Plan: UnifiedFDP ---
-    def chooser_unified_fdp(span_id: str, cards: List[OptionCard], span: Dict[str, Any]) -> Optional[OptionCard]:
-    # Require conventional fixed bridges on *all* spans
-        return _select_top(cards, lambda c: c["family"] == "fixed" and c["kind"] == "fdp")
-
-    total, selected, rules = plan_total_and_selected(chooser_unified_fdp)
+    # --- Plan: UnifiedFDP ---
+    total, selected, _ = _plan_total_and_selected(_chooser_unified_fdp, span_options, span_map, st)
     if total >= 0:
-         plans.append({
-        "plan_id": "Plan_UnifiedFDP",
-        "selected": selected,
-        "total_score": total,
-        "plan_rule_hits": {"absolute": [], "relative": []},
-         })
+        plans.append({
+            "plan_id": "Plan_UnifiedFDP",
+            "selected": selected,
+            "total_score": total,
+            "plan_rule_hits": {"absolute": [], "relative": []},
+        })
 
+    # --- Plan: Mixed_FDP_RPD ---
+    total, selected, picks = _plan_total_and_selected(_chooser_mixed_fdp_rpd, span_options, span_map, st)
+    # Only emit when it is truly "Mixed RPD + FDP"
+    mixed_families = {c["family"] for c in picks}
+    if total >= 0 and "removable" in mixed_families and "fixed" in mixed_families:
+        plans.append({
+            "plan_id": "Plan_Mixed_FDP_RPD",
+            "selected": selected,
+            "total_score": total,
+            "plan_rule_hits": {"absolute": [], "relative": []},
+        })
 
-    # --- Plan: ImplantConversionThenFixed (DE only) ---
-    has_distal_extension = any(span_map[sid]["span_type"] == "DISTAL_EXTENSION" for sid in span_options)
+    # Implant plans are infeasible when implants are contraindicated (E1):
+    # skip the span classification and all three branches up front.
+    # (Append order does not matter; plans are sorted below.)
+    if implants_allowed:
+        flags = _classify_spans(span_options, span_map, top_by_family)
 
-    def chooser_implant_conversion(span_id: str, cards: List[OptionCard], span: Dict[str, Any]) -> Optional[OptionCard]:
-        if span["span_type"] == "DISTAL_EXTENSION":
-            return _select_top(cards, lambda c: c["family"] == "implant")
-        pick = _select_top(cards, lambda c: c["family"] == "fixed")
-        if pick:
-            return pick
-        return _select_top(cards, lambda c: c["family"] == "implant")
-
-    if capabilities.get("implants_allowed", False) and has_distal_extension:
-        ok = True
-        for sid, cards in span_options.items():
-            if span_map[sid]["span_type"] == "DISTAL_EXTENSION":
-                if _select_top(cards, lambda c: c["family"] == "implant") is None:
-                    ok = False
-                    break
-        if ok:
-            total, selected, rules = plan_total_and_selected(chooser_implant_conversion)
+        # --- Plan: ImplantConversionThenFixed (DE only) ---
+        if flags.has_distal_extension and flags.distal_extensions_implantable:
+            total, selected, _ = _plan_total_and_selected(_chooser_implant_conversion, span_options, span_map, st)
             if total >= 0:
                 plans.append({
                     "plan_id": "Plan_ImplantConversionThenFixed",
@@ -168,111 +303,30 @@ def compose_case_plans(
                     "plan_rule_hits": {"absolute": [], "relative": []},
                 })
 
-    # --- Plan: Mixed_FDP_RPD ---
-# Intention: explicitly propose an RPD + FDP combination even when implants
-# are available (e.g., DE spans). We bias RPD on distal-extensions and FDP
-# on bounded spans. We never select implants in this plan.
-    def chooser_mixed_fdp_rpd(span_id: str, cards: List[OptionCard], span: Dict[str, Any]) -> Optional[OptionCard]:
-        if span["span_type"] == "DISTAL_EXTENSION":
-        # Prefer removable (RPD) for DE spans; if no RPD exists, try fixed bridge.
-            pick = _select_top(cards, lambda c: c["family"] == "removable" and c.get("kind") == "rpd")
-            if pick:
-                return pick
-            return _select_top(cards, lambda c: c["family"] == "fixed")
-    # Non-DE spans: prefer fixed bridges (FDP). If none, fall back to RPD.
-        pick = _select_top(cards, lambda c: c["family"] == "fixed")
-        if pick:
-             return pick
-        return _select_top(cards, lambda c: c["family"] == "removable" and c.get("kind") == "rpd")
-
-    total, selected, _ = plan_total_and_selected(chooser_mixed_fdp_rpd)
-    if total >= 0:
-        families: List[str] = []
-        for sid, oid in selected.items():
-            chosen = next(c for c in span_options[sid] if c["option_id"] == oid)
-            families.append(chosen["family"])
-    # Only emit when it is truly "Mixed RPD + FDP"
-        if ("removable" in families) and ("fixed" in families):
-            plans.append({
-            "plan_id": "Plan_Mixed_FDP_RPD",
-            "selected": selected,
-            "total_score": total,
-            "plan_rule_hits": {"absolute": [], "relative": []},
-            })
-
+        # --- Plan: PierResolution_ImplantPlusFixed ---
+        if flags.has_pier and flags.has_implantable_pier_short_span:
+            total, selected, _ = _plan_total_and_selected(_chooser_pier_resolution, span_options, span_map, st)
+            if total >= 0:
+                plans.append({
+                    "plan_id": "Plan_PierResolution_ImplantPlusFixed",
+                    "selected": selected,
+                    "total_score": total,
+                    "plan_rule_hits": {"absolute": [], "relative": []},
+                })
 
-    # --- Plan: PierResolution_ImplantPlusFixed ---
-    def has_implantable_pier_short_span() -> bool:
-        for sid, cards in span_options.items():
-            span = span_map[sid]
-            if span.get("pier_abutments") and span["span_type"] == "BOUNDED" and int(span["length"]) == 1:
-                if _select_top(cards, lambda c: c["family"] == "implant") is not None:
-                    return True
-        return False
-
-    def chooser_pier_resolution(span_id: str, cards: List[OptionCard], span: Dict[str, Any]) -> Optional[OptionCard]:
-        is_pier = bool(span.get("pier_abutments"))
-        if is_pier and span["span_type"] == "BOUNDED" and int(span["length"]) == 1:
-            pick = _select_top(cards, lambda c: c["family"] == "implant")
-            if pick:
-                return pick
-        pick = _select_top(cards, lambda c: c["family"] == "fixed")
-        if pick:
-            return pick
-        pick = _select_top(cards, lambda c: c["family"] == "implant")
-        if pick:
-            return pick
-        return _select_top(cards)
-
-    has_pier = any(span_map[sid].get("pier_abutments") for sid in span_options)
-    if capabilities.get("implants_allowed", False) and has_pier and has_implantable_pier_short_span():
-        total, selected, rules = plan_total_and_selected(chooser_pier_resolution)
-        if total >= 0:
-            plans.append({
-                "plan_id": "Plan_PierResolution_ImplantPlusFixed",
-                "selected": selected,
-                "total_score": total,
-                "plan_rule_hits": {"absolute": [], "relative": []},
-            })
-
-    # --- Plan_ImplantOnEligibleSingles ---
-    # Prefer implants on all single-tooth spans (length==1) where an implant option exists.
-    def has_implantable_single_span() -> bool:
-        if not capabilities.get("implants_allowed", False):
-            return False
-        for sid, cards in span_options.items():
-            span = span_map[sid]
-            if int(span["length"]) == 1 and _select_top(cards, lambda c: c["family"] == "implant"):
-                return True
-        return False
-
-    def chooser_implant_singles(span_id: str, cards: List[OptionCard], span: Dict[str, Any]) -> Optional[OptionCard]:
-        # If this span is single-tooth and an implant option exists, choose it
-        if capabilities.get("implants_allowed", False) and int(span["length"]) == 1:
-            pick = _select_top(cards, lambda c: c["family"] == "implant")
-            if pick:
-                return pick
-        # Otherwise: prefer fixed; then implant; then best available (keeps plan broadly feasible)
-        pick = _select_top(cards, lambda c: c["family"] == "fixed")
-        if pick:
-            return pick
-        pick = _select_top(cards, lambda c: c["family"] == "implant")
-        if pick:
-            return pick
-        return _select_top(cards)
-
-    if has_implantable_single_span():
-        total, selected, rules = plan_total_and_selected(chooser_implant_singles)
-        if total >= 0:
-            plans.append({
-                "plan_id": "Plan_ImplantOnEligibleSingles",
-                "selected": selected,
-                "total_score": total,
-                "plan_rule_hits": {"absolute": [], "relative": []},
-            })
+        # --- Plan_ImplantOnEligibleSingles ---
+        if flags.has_implantable_single_span:
+            total, selected, _ = _plan_total_and_selected(_chooser_implant_singles, span_options, span_map, st)
+            if total >= 0:
+                plans.append({
+                    "plan_id": "Plan_ImplantOnEligibleSingles",
+                    "selected": selected,
+                    "total_score": total,
+                    "plan_rule_hits": {"absolute": [], "relative": []},
+                })
 
     # Sort plans by total_score, then plan_id for stability
-    plans = sorted(plans, key=lambda p: (p["total_score"], p["plan_id"]))
+    plans.sort(key=_PLAN_SORT_KEY)
     return plans
 
 # --------------------------
@@ -280,8 +334,10 @@ def compose_case_plans(
 # --------------------------
 def run_engine(case_payload: Dict[str, Any]) -> Dict[str, Any]:
     normalized = validate_case_payload(case_payload)
-    health_map = build_abutment_health_map(normalized["abutment_health"])
+    abutment_features = build_abutment_features(build_abutment_health_map(normalized["abutment_health"]))
     capabilities = compute_implant_capabilities(normalized["patient_risk"])
+    risk = risk_flags(normalized["patient_risk"])
+    implants_allowed = capabilities["implants_allowed"]
 
     arch_summaries: Dict[str, Dict[str, Any]] = {}
     arch_kennedy_map: Dict[str, Tuple[str, int]] = {}
@@ -293,27 +349,42 @@ def run_engine(case_payload: Dict[str, Any]) -> Dict[str, Any]:
             arch_kennedy_map[arch] = (klass, mods)
 
     span_options: Dict[str, List[OptionCard]] = {}
+    top_by_family: Dict[str, Dict[str, OptionCard]] = {}
+    top_by_family_kind: Dict[str, Dict[Tuple[str, str], OptionCard]] = {}
     discarded_absolute: List[Dict[str, Any]] = []
 
     all_spans_linear: List[Dict[str, Any]] = normalized["spans"]["maxilla"] + normalized["spans"]["mandible"]
+    span_map: Dict[str, Dict[str, Any]] = {}
     for span in all_spans_linear:
+        span_map[span["span_id"]] = span
         ctx = build_span_context(span)
 
-        raw_cards: List[OptionCard] = []
-        raw_cards += eval_fdp(ctx, normalized["patient_risk"], capabilities, health_map)
-        raw_cards += eval_rpd(ctx, normalized["patient_risk"], capabilities, arch_kennedy=arch_kennedy_map.get(ctx["arch"]))
-        raw_cards += eval_implant_single(ctx, normalized["patient_risk"], capabilities)
-        raw_cards += eval_implant_fdp(ctx, normalized["patient_risk"], capabilities)
-        raw_cards += eval_rbb(ctx, normalized["patient_risk"], capabilities, health_map)
-        raw_cards += eval_cantilever(ctx, normalized["patient_risk"], capabilities, health_map)
+        raw_cards: List[EvaluatorCard] = []
+        raw_cards.extend(eval_fdp(ctx, risk, capabilities, abutment_features))
+        raw_cards.extend(eval_rpd(ctx, risk, capabilities, arch_kennedy=arch_kennedy_map.get(ctx["arch"])))
+        # Dispatch on span length: the remaining evaluators return [] outside
+        # their length precondition, so don't call them there (order preserved).
+        # Implant evaluators only run when implants are allowed; otherwise the
+        # E1 contraindication is recorded directly.
+        if not implants_allowed:
+            discarded_absolute.append(implant_contraindication_record(ctx))
+        if ctx["length"] == 1:
+            if implants_allowed:
+                raw_cards.extend(eval_implant_single(ctx, risk, capabilities))
+            raw_cards.extend(eval_rbb(ctx, risk, capabilities, abutment_features))
+            raw_cards.extend(eval_cantilever(ctx, risk, capabilities, abutment_features))
+        elif ctx["length"] >= 2 and implants_allowed:
+            raw_cards.extend(eval_implant_fdp(ctx, risk, capabilities))
 
         kept_cards, dropped = prepare_cards_for_scoring(raw_cards, ctx)
         discarded_absolute.extend(dropped)
 
-        ordered = sort_options(kept_cards, ctx)
+        # kept_cards are fresh dicts from prepare_cards_for_scoring: score in place
+        ordered = sort_options(kept_cards, ctx, owned=True)
         span_options[ctx["span_id"]] = ordered
+        top_by_family[ctx["span_id"]], top_by_family_kind[ctx["span_id"]] = _index_top_cards(ordered)
 
-    case_plans = compose_case_plans(span_options, capabilities, normalized)
+    case_plans = compose_case_plans(span_options, capabilities, span_map, top_by_family, top_by_family_kind)
 
     out = {
         "arch_summaries": arch_summaries,
@@ -326,6 +397,52 @@ def run_engine(case_payload: Dict[str, Any]) -> Dict[str, Any]:
             "discarded_absolute": discarded_absolute,
         },
         "scoring_policy": SCORING_POLICY_ID,
-        "relative_rules_snapshot": sorted(list(RELATIVE_RULES)),
+        "relative_rules_snapshot": list(_RELATIVE_RULES_SNAPSHOT),
     }
     return out
+
+# --------------------------
+# Result cache (identical payload -> identical result)
+# --------------------------
+ENGINE_CACHE_SIZE = 256
+_ENGINE_CACHE: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+_ENGINE_CACHE_LOCK = threading.Lock()
+
+def _payload_key(case_payload: Dict[str, Any]) -> bytes:
+    """Canonical digest of the payload; versions included so upgrades never hit stale entries."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{ENGINE_VERSION}|{RULESET_VERSION}|".encode())
+    h.update(orjson.dumps(case_payload, option=orjson.OPT_SORT_KEYS))
+    return h.digest()
+
+def _cached_run_engine(case_payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    run_engine() behind a small LRU keyed by a canonical payload hash.
+    The returned dict IS the cache entry: only for callers that serialize it
+    straight away (the /api/plan handler); everyone else uses cached_run_engine().
+    """
+    try:
+        key = _payload_key(case_payload)
+    except TypeError:
+        # Not canonically serializable (e.g. sets, non-str keys): just run uncached
+        return run_engine(case_payload)
+    with _ENGINE_CACHE_LOCK:
+        hit = _ENGINE_CACHE.get(key)
+        if hit is not None:
+            _ENGINE_CACHE.move_to_end(key)
+            return hit
+    result = run_engine(case_payload)
+    with _ENGINE_CACHE_LOCK:
+        _ENGINE_CACHE[key] = result
+        if len(_ENGINE_CACHE) > ENGINE_CACHE_SIZE:
+            _ENGINE_CACHE.popitem(last=False)
+    return result
+
+def cached_run_engine(case_payload: Dict[str, Any]) -> Dict[str, Any]:
+    """run_engine() through the result LRU; returns a private copy the caller may mutate."""
+    return copy.deepcopy(_cached_run_engine(case_payload))
+
+def clear_engine_cache() -> None:
+    """Drop all cached engine results (e.g. after hot-reloading rules)."""
+    with _ENGINE_CACHE_LOCK:
+        _ENGINE_CACHE.clear()
@@ -1,9 +1,8 @@
 # rules_evaluators.py
-from typing import List, Dict, Any, Tuple, Optional
-from rules_scoring import OptionCard
+from typing import Dict, Any, Tuple, Optional, NamedTuple, FrozenSet
+from rules_scoring import EvaluatorCard
 from rules_utils import (
-    build_abutment_health_map,
-    abutment_ok_for_cantilever,
+    AbutmentFeatures,
     is_anterior,
 )
 
@@ -11,43 +10,61 @@ from rules_utils import (
 # Helpers
 # ---------------------------------------------------------------------
 
-def _health_for(health_map: Dict[str, Dict[str, Any]], tooth: Optional[str]) -> Optional[Dict[str, Any]]:
+_PARAFUNCTION_BAD: FrozenSet[str] = frozenset({"moderate", "severe"})
+_RISKY_CARIES: FrozenSet[str] = frozenset({"moderate", "high"})
+
+def _features_for(features: Dict[str, AbutmentFeatures], tooth: Optional[str]) -> Optional[AbutmentFeatures]:
     if not tooth:
         return None
-    return health_map.get(str(tooth))
-
-def _abutment_mob_ge2(health: Optional[Dict[str, Any]]) -> bool:
-    if not health:
-        return False
-    mob = str(health.get("mobility_miller"))
-    return mob in {"2", "3"}
-
-def _abutment_crr_bad(health: Optional[Dict[str, Any]]) -> bool:
-    if not health:
-        return False
-    crr = str(health.get("crown_root_ratio"))
-    return crr == "<1:1"
+    return features.get(str(tooth))
 
+# patient_risk enums are checked by validate_case_payload, so values are already canonical strings
 def _parafunction_is_mod_or_severe(patient_risk: Dict[str, Any]) -> bool:
-    pf = str(patient_risk.get("parafunction"))
-    return pf in {"moderate", "severe"}
+    return patient_risk.get("parafunction") in _PARAFUNCTION_BAD
 
 def _occlusion_is_heavy(patient_risk: Dict[str, Any]) -> bool:
-    return str(patient_risk.get("occlusal_scheme")) == "Heavy"
+    return patient_risk.get("occlusal_scheme") == "Heavy"
 
 def _caries_or_hygiene_risky(patient_risk: Dict[str, Any]) -> bool:
     # caries: moderate/high OR systemic poor_hygiene flag
-    cr = str(patient_risk.get("caries_risk"))
-    if cr in {"moderate", "high"}:
+    if patient_risk.get("caries_risk") in _RISKY_CARIES:
         return True
-    sys_flags = set(patient_risk.get("systemic_flags", []))
-    return "poor_hygiene" in sys_flags
+    return "poor_hygiene" in patient_risk.get("systemic_flags", [])
+
+class RiskFlags(NamedTuple):
+    """Patient-level soft factors, derived once per case and shared by all evaluators."""
+    occlusion_heavy: bool
+    parafunction_mod_or_severe: bool
+    caries_high: bool
+    # Soft-penalty rule ids each evaluator appends, in its reporting order
+    fdp_penalties: Tuple[str, ...]
+    implant_penalties: Tuple[str, ...]
+    cantilever_penalties: Tuple[str, ...]
+
+def risk_flags(patient_risk: Dict[str, Any]) -> RiskFlags:
+    """
+    Evaluate all patient-level predicates in one pass and resolve them into
+    the per-evaluator soft-penalty tuples, so the per-span path is one extend().
+    """
+    heavy = _occlusion_is_heavy(patient_risk)
+    para = _parafunction_is_mod_or_severe(patient_risk)
+    c2 = ("C2_OcclusionRisk",) if heavy else ()
+    e3 = ("E3_CariesOrHygieneRisk",) if _caries_or_hygiene_risky(patient_risk) else ()
+    e4 = ("E4_Parafunction",) if para else ()
+    return RiskFlags(
+        occlusion_heavy=heavy,
+        parafunction_mod_or_severe=para,
+        caries_high=patient_risk.get("caries_risk") == "high",
+        fdp_penalties=c2 + e3 + e4,
+        implant_penalties=c2 + e4 + e3,
+        cantilever_penalties=c2 + e4,
+    )
 
 def _require(ctx: Dict[str, Any], key: str):
     if key not in ctx:
         raise KeyError(f"SpanContext missing '{key}'")
 
-def _mk_card_base(ctx: Dict[str, Any], *, option_id: str, family: str, kind: str, length: int) -> OptionCard:
+def _mk_card_base(ctx: Dict[str, Any], *, option_id: str, family: str, kind: str, length: int) -> EvaluatorCard:
     # Strict required fields for OptionCard
     for k in ("span_id", "arch", "span_type"):
         _require(ctx, k)
@@ -62,17 +79,51 @@ def _mk_card_base(ctx: Dict[str, Any], *, option_id: str, family: str, kind: str
         "arch": ctx["arch"],
         "span_type": ctx["span_type"],
         "length": length,
-        "rule_hits": {"absolute": [], "relative": []},
+        "absolute_hits": [],
+        "relative_hits": [],
         "meta": {},
     }
 
-def _abs(card: OptionCard, rule_id: str):
-    card["rule_hits"]["absolute"].append(rule_id)
+def _abs(card: EvaluatorCard, rule_id: str):
+    card["absolute_hits"].append(rule_id)
+
+def _rel(card: EvaluatorCard, rule_id: str):
+    card["relative_hits"].append(rule_id)
+
+def _apply_soft_penalties(card: EvaluatorCard, rule_ids: Tuple[str, ...]):
+    # Patient-level soft factors, pre-resolved per evaluator by risk_flags()
+    card["relative_hits"].extend(rule_ids)
+
+def _finish_implant_card(card: EvaluatorCard, risk: RiskFlags,
+                         capabilities: Dict[str, Any]) -> Tuple[EvaluatorCard, ...]:
+    """Shared tail of the implant evaluators: E1 hard gate, else soft penalties."""
+    if not capabilities["implants_allowed"]:
+        _abs(card, "E1_ImplantContraindication")
+    else:
+        _apply_soft_penalties(card, risk.implant_penalties)
+    return (card,)
+
+def _implant_single_id(ctx: Dict[str, Any]) -> str:
+    return f"IMP_SINGLE_{ctx['span_id']}_{ctx.get('pontic_tooth')}"
 
-def _rel(card: OptionCard, rule_id: str):
-    card["rule_hits"]["relative"].append(rule_id)
+def _implant_fdp_id(ctx: Dict[str, Any]) -> str:
+    return f"IMP_FDP_{ctx['span_id']}_len{ctx['length']}"
 
-# Cantilever: allowed pontic→abutment pairs (single-tooth spans only)
+def implant_contraindication_record(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    E1 provenance for a span when implants are contraindicated: the same
+    discarded_absolute entry the gated implant card would produce, without
+    building (and then discarding) the card.
+    """
+    option_id = _implant_single_id(ctx) if ctx["length"] == 1 else _implant_fdp_id(ctx)
+    return {"option_id": option_id, "span_id": ctx["span_id"], "absolute": ["E1_ImplantContraindication"]}
+
+# Shared result for evaluators that do not apply to a span (no per-call list)
+_EMPTY: Tuple[EvaluatorCard, ...] = ()
+
+# Cantilever: allowed pontic→abutment pairs (single-tooth spans only).
+# Keyed by the str pontic that build_span_context already provides: one dict
+# probe on a cached str hash, cheaper than int()-parsing into an index table.
 REQUIRED_CL_ABUTMENT: Dict[str, str] = {
     # Lateral ⇐ Canine
     "12": "13", "22": "23", "32": "33", "42": "43",
@@ -82,13 +133,13 @@ REQUIRED_CL_ABUTMENT: Dict[str, str] = {
 
 # ---------------------------------------------------------------------
 # Evaluators
-#   Each returns a list[OptionCard] (possibly empty).
-#   Absolute gates: add rule_ids to card.rule_hits.absolute (or omit the card).
-#   Relative penalties: add rule_ids to card.rule_hits.relative.
+#   Each returns a tuple of EvaluatorCards (the shared _EMPTY when it rejects).
+#   Absolute gates: add rule_ids to card.absolute_hits (or omit the card).
+#   Relative penalties: add rule_ids to card.relative_hits.
 # ---------------------------------------------------------------------
 
-def eval_fdp(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Dict[str, Any],
-             health_map: Dict[str, Dict[str, Any]]) -> List[OptionCard]:
+def eval_fdp(ctx: Dict[str, Any], risk: RiskFlags, capabilities: Dict[str, Any],
+             features: Dict[str, AbutmentFeatures]) -> Tuple[EvaluatorCard, ...]:
     """
     FDP (conventional, requires mesial+distal abutments).
     Relative penalties (MVP):
@@ -108,40 +159,35 @@ def eval_fdp(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Di
                          option_id=f"FIX_FDP_{ctx['span_id']}",
                          family="fixed",
                          kind="fdp",
-                         length=int(ctx["length"]))
+                         length=ctx["length"])
     card["meta"]["abutments"] = {"mesial": mesial, "distal": distal}
 
     # Hard gate: need both abutments
     if not mesial or not distal:
         _abs(card, "D1_NoPosteriorAbutment")
-        return [card]
+        return (card,)
 
     # Relative penalties based on abutment health
-    hm = _health_for(health_map, mesial)
-    hd = _health_for(health_map, distal)
-    if _abutment_mob_ge2(hm) or _abutment_mob_ge2(hd):
+    fm = _features_for(features, mesial)
+    fd = _features_for(features, distal)
+    if (fm and fm.mob_ge2) or (fd and fd.mob_ge2):
         _rel(card, "B1_CompromisedAbutment")
-    if _abutment_crr_bad(hm) or _abutment_crr_bad(hd):
+    if (fm and fm.crr_bad) or (fd and fd.crr_bad):
         _rel(card, "B4_UnfavorableCrownRoot")
 
     # Global functional/systemic soft factors
-    if _occlusion_is_heavy(patient_risk):
-        _rel(card, "C2_OcclusionRisk")
-    if _caries_or_hygiene_risky(patient_risk):
-        _rel(card, "E3_CariesOrHygieneRisk")
-    if _parafunction_is_mod_or_severe(patient_risk):
-        _rel(card, "E4_Parafunction")
+    _apply_soft_penalties(card, risk.fdp_penalties)
 
     # Pier handling (design modifier) — if ctx provides it
     if ctx.get("pier_abutments"):
         # Not a penalty in MVP; record design note for downstream UI/report.
         card["meta"].setdefault("modifiers", []).append("NonRigidConnector")
 
-    return [card]
+    return (card,)
 
 
-def eval_rpd(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Dict[str, Any],
-             arch_kennedy: Optional[Tuple[str, int]] = None) -> List[OptionCard]:
+def eval_rpd(ctx: Dict[str, Any], risk: RiskFlags, capabilities: Dict[str, Any],
+             arch_kennedy: Optional[Tuple[str, int]] = None) -> Tuple[EvaluatorCard, ...]:
     """
     RPD is always available in MVP.
     Relative penalty:
@@ -152,7 +198,7 @@ def eval_rpd(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Di
                          option_id=f"RPD_{ctx['arch']}_{ctx['span_id']}",
                          family="removable",
                          kind="rpd",
-                         length=int(ctx["length"]))
+                         length=ctx["length"])
 
     if arch_kennedy is not None:
         klass, mods = arch_kennedy
@@ -165,10 +211,10 @@ def eval_rpd(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Di
         card["meta"]["kennedy_class"] = None
         card["meta"]["modifications"] = None
 
-    return [card]
+    return (card,)
 
 
-def eval_implant_single(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Dict[str, Any]) -> List[OptionCard]:
+def eval_implant_single(ctx: Dict[str, Any], risk: RiskFlags, capabilities: Dict[str, Any]) -> Tuple[EvaluatorCard, ...]:
     """
     Single implant (length == 1). Hard gate E1 via capabilities['implants_allowed'].
     Relative penalties:
@@ -176,31 +222,20 @@ def eval_implant_single(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capab
     """
     if "implants_allowed" not in capabilities:
         raise KeyError("capabilities missing 'implants_allowed'")
-    if int(ctx["length"]) != 1:
-        return []
+    if ctx["length"] != 1:
+        return _EMPTY
 
     card = _mk_card_base(ctx,
-                         option_id=f"IMP_SINGLE_{ctx['span_id']}_{ctx.get('pontic_tooth')}",
+                         option_id=_implant_single_id(ctx),
                          family="implant",
                          kind="implant_single",
                          length=1)
     card["meta"]["site"] = ctx.get("pontic_tooth")
 
-    if not capabilities["implants_allowed"]:
-        _abs(card, "E1_ImplantContraindication")
-        return [card]
-
-    if _occlusion_is_heavy(patient_risk):
-        _rel(card, "C2_OcclusionRisk")
-    if _parafunction_is_mod_or_severe(patient_risk):
-        _rel(card, "E4_Parafunction")
-    if _caries_or_hygiene_risky(patient_risk):
-        _rel(card, "E3_CariesOrHygieneRisk")
-
-    return [card]
+    return _finish_implant_card(card, risk, capabilities)
 
 
-def eval_implant_fdp(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Dict[str, Any]) -> List[OptionCard]:
+def eval_implant_fdp(ctx: Dict[str, Any], risk: RiskFlags, capabilities: Dict[str, Any]) -> Tuple[EvaluatorCard, ...]:
     """
     Implant-supported FDP (length >= 2). Hard gate E1 via capabilities.
     Relative penalties:
@@ -208,31 +243,20 @@ def eval_implant_fdp(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabili
     """
     if "implants_allowed" not in capabilities:
         raise KeyError("capabilities missing 'implants_allowed'")
-    if int(ctx["length"]) < 2:
-        return []
+    if ctx["length"] < 2:
+        return _EMPTY
 
     card = _mk_card_base(ctx,
-                         option_id=f"IMP_FDP_{ctx['span_id']}_len{ctx['length']}",
+                         option_id=_implant_fdp_id(ctx),
                          family="implant",
                          kind="implant_fdp",
-                         length=int(ctx["length"]))
-
-    if not capabilities["implants_allowed"]:
-        _abs(card, "E1_ImplantContraindication")
-        return [card]
-
-    if _occlusion_is_heavy(patient_risk):
-        _rel(card, "C2_OcclusionRisk")
-    if _parafunction_is_mod_or_severe(patient_risk):
-        _rel(card, "E4_Parafunction")
-    if _caries_or_hygiene_risky(patient_risk):
-        _rel(card, "E3_CariesOrHygieneRisk")
+                         length=ctx["length"])
 
-    return [card]
+    return _finish_implant_card(card, risk, capabilities)
 
 
-def eval_rbb(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Dict[str, Any],
-             health_map: Dict[str, Dict[str, Any]]) -> List[OptionCard]:
+def eval_rbb(ctx: Dict[str, Any], risk: RiskFlags, capabilities: Dict[str, Any],
+             features: Dict[str, AbutmentFeatures]) -> Tuple[EvaluatorCard, ...]:
     """
     Resin-bonded bridge (RBB) — strict C5 gate in MVP:
       - Single tooth span (length == 1)
@@ -244,12 +268,12 @@ def eval_rbb(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Di
       - Caries risk not 'high'
     Relative penalties: none (binary eligibility in MVP).
     """
-    if int(ctx["length"]) != 1:
-        return []
+    if ctx["length"] != 1:
+        return _EMPTY
 
     pontic = ctx.get("pontic_tooth")
-    if not pontic or not is_anterior(str(pontic)) or str(pontic)[1] == "3":
-        return []
+    if not pontic or not is_anterior(pontic) or pontic[1] == "3":
+        return _EMPTY
 
     # Neighbors: use mesial/distal abutments from ctx (span length 1)
     _require(ctx, "abutments")
@@ -267,30 +291,30 @@ def eval_rbb(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Di
     # Hard gates (C5)
     if not mesial or not distal:
         _abs(card, "C5_RBBPrereqMissing_AdjacentToothMissing")
-        return [card]
+        return (card,)
 
-    hm = _health_for(health_map, mesial)
-    hd = _health_for(health_map, distal)
-    if not (hm and hd and bool(hm.get("enamel_ok_for_rbb")) and bool(hd.get("enamel_ok_for_rbb"))):
+    fm = _features_for(features, mesial)
+    fd = _features_for(features, distal)
+    if not (fm and fd and fm.enamel_ok and fd.enamel_ok):
         _abs(card, "C5_RBBPrereqMissing_EnamelNotOK")
-        return [card]
+        return (card,)
 
-    if _occlusion_is_heavy(patient_risk):
+    if risk.occlusion_heavy:
         _abs(card, "C5_RBBPrereqMissing_HeavyOcclusion")
-        return [card]
-    if _parafunction_is_mod_or_severe(patient_risk):
+        return (card,)
+    if risk.parafunction_mod_or_severe:
         _abs(card, "C5_RBBPrereqMissing_Parafunction")
-        return [card]
-    if str(patient_risk.get("caries_risk")) == "high":
+        return (card,)
+    if risk.caries_high:
         _abs(card, "C5_RBBPrereqMissing_HighCaries")
-        return [card]
+        return (card,)
 
     # Eligible → no relative penalties in MVP
-    return [card]
+    return (card,)
 
 
-def eval_cantilever(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilities: Dict[str, Any],
-                    health_map: Dict[str, Dict[str, Any]]) -> List[OptionCard]:
+def eval_cantilever(ctx: Dict[str, Any], risk: RiskFlags, capabilities: Dict[str, Any],
+                    features: Dict[str, AbutmentFeatures]) -> Tuple[EvaluatorCard, ...]:
     """
     Cantilever (CL) — *anterior-only* patterns allowed in MVP:
       - Lateral ⇐ Canine (12⇐13, 22⇐23, 32⇐33, 42⇐43)
@@ -305,14 +329,14 @@ def eval_cantilever(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilit
       - C2_OcclusionRisk if Heavy
       - E4_Parafunction if moderate/severe
     """
-    if int(ctx["length"]) != 1:
-        return []
+    if ctx["length"] != 1:
+        return _EMPTY
 
     pontic = ctx.get("pontic_tooth")
     if not pontic:
-        return []
+        return _EMPTY
 
-    required_abut = REQUIRED_CL_ABUTMENT.get(str(pontic))
+    required_abut = REQUIRED_CL_ABUTMENT.get(pontic)
     # Build card now to attach absolute reasons if we reject
     card = _mk_card_base(ctx,
                          option_id=f"FIX_CL_{ctx['span_id']}_{pontic}",
@@ -325,33 +349,30 @@ def eval_cantilever(ctx: Dict[str, Any], patient_risk: Dict[str, Any], capabilit
     # Hard gates
     if required_abut is None:
         _abs(card, "C4a_CL_NotAllowedPontic")
-        return [card]
+        return (card,)
 
     if bool(ctx.get("cross_midline", False)):
         _abs(card, "C4a_CL_CrossMidline")
-        return [card]
+        return (card,)
 
     # Check presence of the required abutment tooth
     # We consider it present if it is not in the current span's missing_teeth
     # and (ideally) appears as a current tooth in arch. Span detector already
     # sets abutments for generic spans; here we require the specific tooth.
-    missing_set = set(str(t) for t in ctx.get("missing_teeth", []))
-    if required_abut in missing_set:
+    if required_abut in ctx["missing_teeth_set"]:
         _abs(card, "C4a_CL_RequiredAbutmentMissing")
-        return [card]
+        return (card,)
 
     # Health check for the required abutment
-    if not abutment_ok_for_cantilever(health_map, required_abut):
+    fa = features.get(required_abut)
+    if not (fa and fa.cl_ok):
         _abs(card, "C4a_CL_AbutmentHealthFail")
-        return [card]
+        return (card,)
 
     # Relative penalties (soft)
-    if _occlusion_is_heavy(patient_risk):
-        _rel(card, "C2_OcclusionRisk")
-    if _parafunction_is_mod_or_severe(patient_risk):
-        _rel(card, "E4_Parafunction")
+    _apply_soft_penalties(card, risk.cantilever_penalties)
 
     # Eligible
     card["meta"]["abutment"] = required_abut
-    return [card]
+    return (card,)
 
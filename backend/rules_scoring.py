@@ -1,5 +1,6 @@
 # rules_scoring.py
-from typing import Dict, List, Set, TypedDict, Literal, Any
+from operator import itemgetter
+from typing import Dict, List, FrozenSet, Tuple, TypedDict, Literal, Any, Callable
 
 # ---------------- Typing ----------------
 Family = Literal["fixed", "removable", "implant"]
@@ -20,12 +21,28 @@ class OptionCard(TypedDict):
     # Added by scorer:
     # rank_score: int
 
+class EvaluatorCard(TypedDict):
+    """
+    Card as emitted by rules_evaluators: rule hits are kept as two flat lists
+    (no nested dict per card). rules_cards folds them into OptionCard.rule_hits.
+    """
+    option_id: str
+    family: Family
+    kind: Kind
+    span_id: str
+    arch: Arch
+    span_type: SpanType
+    length: int
+    absolute_hits: List[str]
+    relative_hits: List[str]
+    meta: Dict[str, Any]
+
 # --------------- Policy IDs ---------------
 SCORING_POLICY_ID = "MVP_relative_only_v1"
 
 # --------------- Relative rules catalog (MVP, trimmed) ---------------
 # Each recognized ID contributes +1 to rank_score when present in `rule_hits["relative"]`.
-RELATIVE_RULES: Set[str] = {
+RELATIVE_RULES: FrozenSet[str] = frozenset({
     # FDP-related soft factors
     "B1_CompromisedAbutment",     # abutment mobility ≥ 2
     "B4_UnfavorableCrownRoot",    # CRR < 1:1
@@ -37,47 +54,65 @@ RELATIVE_RULES: Set[str] = {
 
     # RPD complexity
     "RPD_ComplexDesign",          # Kennedy I/II with modifications
-}
+})
+
+# Rule-id registry: one bit per relative rule, so scoring ORs masks instead of
+# building a per-card set of strings. Unknown ids map to 0 (not counted).
+RELATIVE_RULE_BITS: Dict[str, int] = {rid: 1 << i for i, rid in enumerate(sorted(RELATIVE_RULES))}
 
 __all__ = [
+    "EvaluatorCard",
     "OptionCard",
     "RELATIVE_RULES",
+    "RELATIVE_RULE_BITS",
     "SCORING_POLICY_ID",
     "apply_relative_penalties",
+    "apply_relative_penalties_batch",
     "sort_options",
 ]
 
 # --------------- Core scoring ---------------
-def apply_relative_penalties(rule_ids: List[str]) -> int:
+def _relative_mask(rule_ids: List[str], get_bit: Callable[[str, int], int]) -> int:
     """
-    Count distinct, recognized relative rule IDs (+1 each).
+    OR of the catalog bits for `rule_ids` (unknown ids contribute 0).
     Strict: requires `rule_ids` to be a list of strings; otherwise raises.
     """
     if not isinstance(rule_ids, list):
         raise TypeError("rule_ids must be a list of strings")
-    uniq: Set[str] = set()
+    mask = 0
     for r in rule_ids:
         if not isinstance(r, str):
             raise TypeError("rule_ids must contain only strings")
-        uniq.add(r)
-    # Only count rules that are part of the centralized catalog
-    return sum(1 for r in uniq if r in RELATIVE_RULES)
+        # Only rules that are part of the centralized catalog set a bit
+        mask |= get_bit(r, 0)
+    return mask
 
-# --------------- Tie-breaker helpers ---------------
-def _family_bias(span_type: SpanType, family: Family) -> int:
+def apply_relative_penalties(rule_ids: List[str]) -> int:
+    """
+    Count distinct, recognized relative rule IDs (+1 each).
+    Strict: requires `rule_ids` to be a list of strings; otherwise raises.
     """
-    Tie-breaker bias for family when NOT distal-extension:
-      fixed -> 0 (preferred), implant -> 1 (neutral), removable -> 2 (least)
-    If span is distal-extension, no bias is applied (all -> 1).
+    # Duplicates OR into the same bit, so the popcount is the distinct count
+    return _relative_mask(rule_ids, RELATIVE_RULE_BITS.get).bit_count()
+
+def apply_relative_penalties_batch(rule_ids_batch: List[List[str]]) -> List[int]:
+    """
+    apply_relative_penalties over many cards at once (e.g. every option of a
+    case, or of a batch of cases): one score per input list, in order.
+    Same strictness as the single-card version.
     """
-    if span_type == "DISTAL_EXTENSION":
-        return 1
-    if family == "fixed":
-        return 0
-    if family == "implant":
-        return 1
-    # family == "removable"
-    return 2
+    if not isinstance(rule_ids_batch, list):
+        raise TypeError("rule_ids_batch must be a list of rule_id lists")
+    get_bit = RELATIVE_RULE_BITS.get
+    return [_relative_mask(rule_ids, get_bit).bit_count() for rule_ids in rule_ids_batch]
+
+# --------------- Tie-breaker helpers ---------------
+# Tie-breaker bias for family when NOT distal-extension:
+#   fixed -> 0 (preferred), implant -> 1 (neutral), removable -> 2 (least)
+# If span is distal-extension, no bias is applied (all -> 1). The table is
+# resolved once per sort_options call, leaving a single dict lookup per card.
+_FAMILY_BIAS: Dict[str, int] = {"fixed": 0, "implant": 1, "removable": 2}
+_NO_FAMILY_BIAS: Dict[str, int] = {}
 
 def _length_key(length: int) -> int:
     """
@@ -89,8 +124,35 @@ def _length_key(length: int) -> int:
         raise ValueError("OptionCard.length must be >= 0")
     return length
 
+# Sort on the precomputed key only (never fall through to comparing cards)
+_SORT_KEY = itemgetter(0)
+
+def _score_card(card: OptionCard, st: SpanType, owned: bool) -> OptionCard:
+    """Strictly check one card for sort_options and return it with `rank_score` attached."""
+    # Mandatory fields check (strict)
+    for field in ("option_id", "family", "kind", "span_id", "arch", "span_type", "length", "rule_hits", "meta"):
+        if field not in card:
+            raise KeyError(f"OptionCard missing '{field}'")
+    # Ensure card span_type matches context span_type (consistency guard)
+    if card["span_type"] != st:
+        raise ValueError(f"OptionCard.span_type '{card['span_type']}' does not match span_context '{st}'")
+    # Relative rules extraction (strict)
+    rh = card["rule_hits"]
+    if not isinstance(rh, dict):
+        raise TypeError("OptionCard.rule_hits must be a dict")
+    relative = rh.get("relative", [])
+    # Absolute cards are expected to be dropped upstream; warn strictly if present
+    if rh.get("absolute"):
+        raise ValueError("Absolute-hit OptionCard passed to sort_options; filter absolutes upstream")
+
+    # Attach score; shallow copy first unless the caller owns the cards
+    c2: OptionCard = card if owned else dict(card)  # type: ignore[assignment]
+    c2["rank_score"] = apply_relative_penalties(relative)  # type: ignore[index]
+    return c2
+
 # --------------- Public API ---------------
-def sort_options(options: List[OptionCard], span_context: Dict[str, Any]) -> List[OptionCard]:
+def sort_options(options: List[OptionCard], span_context: Dict[str, Any], *,
+                 owned: bool = False) -> List[OptionCard]:
     """
     Attach `rank_score` to each card and return a NEW list sorted by:
       1) rank_score asc (lower is better)
@@ -103,46 +165,44 @@ def sort_options(options: List[OptionCard], span_context: Dict[str, Any]) -> Lis
       - Each OptionCard must include: option_id, family, kind, span_id, arch, span_type, length, rule_hits, meta.
       - `rule_hits["relative"]` must be a list[str]; absolute cards must be filtered upstream.
       - Raises on missing/invalid fields (fail-fast).
+
+    Input cards are not mutated (each is copied before scoring) unless
+    `owned=True`, which lets callers that built the cards themselves skip the copy.
     """
     # Require span_type explicitly (no defaults)
     if "span_type" not in span_context:
         raise KeyError("span_context missing 'span_type'")
     st: SpanType = span_context["span_type"]  # type: ignore[assignment]
 
-    scored: List[OptionCard] = []
+    # Zero or one card: nothing to order, so only the strict checks and scoring run
+    if len(options) <= 1:
+        single: List[OptionCard] = []
+        for card in options:
+            c2 = _score_card(card, st, owned)
+            _length_key(c2["length"])  # same strict length check the sort key applies
+            single.append(c2)
+        return single
+
+    if st == "DISTAL_EXTENSION":
+        bias_table, bias_default = _NO_FAMILY_BIAS, 1
+    else:
+        bias_table, bias_default = _FAMILY_BIAS, 2
+    family_bias = bias_table.get
+
+    keyed: List[Tuple[Tuple[int, int, int, str], OptionCard]] = []
     for card in options:
-        # Mandatory fields check (strict)
-        for field in ("option_id", "family", "kind", "span_id", "arch", "span_type", "length", "rule_hits", "meta"):
-            if field not in card:
-                raise KeyError(f"OptionCard missing '{field}'")
-        # Ensure card span_type matches context span_type (consistency guard)
-        if card["span_type"] != st:
-            raise ValueError(f"OptionCard.span_type '{card['span_type']}' does not match span_context '{st}'")
-        # Relative rules extraction (strict)
-        rh = card["rule_hits"]
-        if not isinstance(rh, dict):
-            raise TypeError("OptionCard.rule_hits must be a dict")
-        relative = rh.get("relative", [])
-        # Absolute cards are expected to be dropped upstream; warn strictly if present
-        if rh.get("absolute"):
-            raise ValueError("Absolute-hit OptionCard passed to sort_options; filter absolutes upstream")
-        score = apply_relative_penalties(relative)
-
-        # Shallow copy + attach score (do not mutate input)
-        c2: OptionCard = dict(card)  # type: ignore[assignment]
-        c2["rank_score"] = score  # type: ignore[index]
-        scored.append(c2)
-
-    # Sorting key: score, family bias (conditional), length, option_id
-    def key_fn(c: OptionCard):
-        family: Family = c["family"]
-        length_key = _length_key(c["length"])
-        option_id = c["option_id"]
-        return (
-            c["rank_score"],                 # primary: fewer penalties first
-            _family_bias(st, family),        # fixed > removable when not distal-extension (implant neutral)
-            length_key,                      # shorter first
-            option_id,                       # stable alphabetical
-        )
-
-    return sorted(scored, key=key_fn)
+        c2 = _score_card(card, st, owned)
+
+        # Sorting key, built once per card while its fields are at hand
+        keyed.append((
+            (
+                c2["rank_score"],                   # primary: fewer penalties first
+                family_bias(card["family"], bias_default),  # fixed > removable when not distal-extension (implant neutral)
+                _length_key(card["length"]),        # shorter first
+                card["option_id"],                  # stable alphabetical
+            ),
+            c2,
+        ))
+
+    keyed.sort(key=_SORT_KEY)
+    return [c for _, c in keyed]
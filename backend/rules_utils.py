@@ -1,16 +1,16 @@
 # rules_utils.py
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, List, Set, FrozenSet, Tuple, Optional, NamedTuple
 
 # ---------------------- FDI maps ----------------------
-CENTRALS: Set[str] = {"11", "21", "31", "41"}
-LATERALS: Set[str] = {"12", "22", "32", "42"}
-CANINES:  Set[str] = {"13", "23", "33", "43"}
-ANTERIOR: Set[str] = CENTRALS | LATERALS | CANINES
+CENTRALS: FrozenSet[str] = frozenset({"11", "21", "31", "41"})
+LATERALS: FrozenSet[str] = frozenset({"12", "22", "32", "42"})
+CANINES:  FrozenSet[str] = frozenset({"13", "23", "33", "43"})
+ANTERIOR: FrozenSet[str] = CENTRALS | LATERALS | CANINES
 
-# ---------------------- Tooth helpers ----------------------
-def arch_of_tooth(tooth: str) -> str:
-    """Return 'maxilla' or 'mandible' based on FDI quadrant."""
-    q = int(str(tooth)[0])
+_PAIRED_CENTRAL: Dict[str, str] = {"11": "21", "21": "11", "31": "41", "41": "31"}
+_ADJ_CANINE_FOR_LATERAL: Dict[str, str] = {"12": "13", "22": "23", "32": "33", "42": "43"}
+
+def _arch_of_quadrant(q: int) -> str:
     return "maxilla" if q in (1, 2) else "mandible"
 
 def side_of_quadrant(q: int) -> str:
@@ -25,26 +25,42 @@ def side_of_quadrant(q: int) -> str:
         return "L"
     raise ValueError(f"Invalid quadrant: {q}")
 
+# Precomputed for the 32 permanent FDI teeth; other inputs take the parsing path
+_FDI_TEETH: Tuple[Tuple[str, int], ...] = tuple((f"{q}{n}", q) for q in (1, 2, 3, 4) for n in range(1, 9))
+_ARCH_OF_TOOTH: Dict[str, str] = {t: _arch_of_quadrant(q) for t, q in _FDI_TEETH}
+_SIDE_OF_TOOTH: Dict[str, str] = {t: side_of_quadrant(q) for t, q in _FDI_TEETH}
+
+# ---------------------- Tooth helpers ----------------------
+def arch_of_tooth(tooth: str) -> str:
+    """Return 'maxilla' or 'mandible' based on FDI quadrant."""
+    arch = _ARCH_OF_TOOTH.get(tooth)
+    if arch is None:
+        arch = _arch_of_quadrant(int(str(tooth)[0]))
+    return arch
+
 def side_of_tooth(tooth: str) -> str:
     """Return 'R' or 'L' for a single FDI tooth using its quadrant."""
-    return side_of_quadrant(int(str(tooth)[0]))
+    side = _SIDE_OF_TOOTH.get(tooth)
+    if side is None:
+        side = side_of_quadrant(int(str(tooth)[0]))
+    return side
 
+# Teeth on the validated path are already str; these helpers only coerce other
+# types (`type(t) is str` skips the str() call on the hot path).
 def is_anterior(tooth: str) -> bool:
     """True for centrals, laterals, canines."""
-    return str(tooth) in ANTERIOR
+    return (tooth if type(tooth) is str else str(tooth)) in ANTERIOR
 
 def paired_central(tooth: str) -> Optional[str]:
     """
     Return the other central in the SAME arch (no cross-arch).
     11<->21, 31<->41
     """
-    pairs = {"11": "21", "21": "11", "31": "41", "41": "31"}
-    return pairs.get(str(tooth))
+    return _PAIRED_CENTRAL.get(tooth if type(tooth) is str else str(tooth))
 
 def adjacent_canine_for_lateral(tooth: str) -> Optional[str]:
     """Map a lateral to its adjacent canine in the SAME arch."""
-    m = {"12": "13", "22": "23", "32": "33", "42": "43"}
-    return m.get(str(tooth))
+    return _ADJ_CANINE_FOR_LATERAL.get(tooth if type(tooth) is str else str(tooth))
 
 # ---------------------- Abutment health ----------------------
 def build_abutment_health_map(abutment_health_list: List[Dict]) -> Dict[str, Dict]:
@@ -67,6 +83,12 @@ def build_abutment_health_map(abutment_health_list: List[Dict]) -> Dict[str, Dic
             out[t] = rec
     return out
 
+# MVP abutment health thresholds (single source for the evaluators' predicates)
+COMPROMISED_MOBILITY: FrozenSet[str] = frozenset({"2", "3"})  # Miller mobility >= 2
+UNFAVORABLE_CRR = "<1:1"
+CANTILEVER_OK_MOBILITY: FrozenSet[str] = frozenset({"0", "1"})
+CANTILEVER_OK_CRR: FrozenSet[str] = frozenset({">=1:1", "≈1:1"})
+
 def abutment_ok_for_cantilever(health_map: Dict[str, Dict], tooth: str) -> bool:
     """
     MVP thresholds for a cantilever abutment:
@@ -78,7 +100,29 @@ def abutment_ok_for_cantilever(health_map: Dict[str, Dict], tooth: str) -> bool:
         return False
     mob = str(h.get("mobility_miller"))
     crr = str(h.get("crown_root_ratio"))
-    return mob in ("0", "1") and crr in (">=1:1", "≈1:1")
+    return mob in CANTILEVER_OK_MOBILITY and crr in CANTILEVER_OK_CRR
+
+class AbutmentFeatures(NamedTuple):
+    """Health predicates for one abutment, derived once per case from its record."""
+    mob_ge2: bool      # Miller mobility 2 or 3
+    crr_bad: bool      # crown-root ratio < 1:1
+    enamel_ok: bool    # enamel OK for RBB bonding
+    cl_ok: bool        # passes abutment_ok_for_cantilever thresholds
+
+def build_abutment_features(health_map: Dict[str, Dict]) -> Dict[str, AbutmentFeatures]:
+    """
+    Pack every abutment's health record into AbutmentFeatures in one pass, so
+    evaluators look flags up instead of re-deriving them per span/option.
+    """
+    out: Dict[str, AbutmentFeatures] = {}
+    for t, h in health_map.items():
+        out[t] = AbutmentFeatures(
+            mob_ge2=str(h.get("mobility_miller")) in COMPROMISED_MOBILITY,
+            crr_bad=str(h.get("crown_root_ratio")) == UNFAVORABLE_CRR,
+            enamel_ok=bool(h.get("enamel_ok_for_rbb")),
+            cl_ok=abutment_ok_for_cantilever(health_map, t),
+        )
+    return out
 
 # ---------------------- Kennedy classification ----------------------
 def _sides_for_spans(spans_in_arch: List[Dict]) -> Set[str]:
@@ -90,7 +134,7 @@ def _sides_for_spans(spans_in_arch: List[Dict]) -> Set[str]:
     for s in spans_in_arch:
         for t in s.get("missing_teeth", []):
             if t:
-                sides.add(side_of_tooth(str(t)))
+                sides.add(side_of_tooth(t))
     return sides
 
 def kennedy_class_for_arch(spans_in_arch: List[Dict]) -> Tuple[str, int]:
@@ -1,5 +1,5 @@
 # rules_validation.py
-from typing import Dict, Any, List, Literal, TypedDict
+from typing import Dict, Any, FrozenSet, List, Literal, TypedDict
 
 # ----- enums for quick checks -----
 Caries = Literal["low", "moderate", "high"]
@@ -26,10 +26,11 @@ class NormalizedPayload(TypedDict):
     patient_risk: Dict[str, Any]
     abutment_health: List[Dict[str, Any]]
 
-VALID_CARIES = {"low", "moderate", "high"}
-VALID_OCCLUSION = {"Favorable", "Heavy", "Parafunction"}
-VALID_PARAFUNCTION = {"none", "mild", "moderate", "severe"}
-VALID_OPPOSING = {"natural", "complete_denture", "implant_supported", "mixed"}
+VALID_CARIES: FrozenSet[str] = frozenset({"low", "moderate", "high"})
+VALID_OCCLUSION: FrozenSet[str] = frozenset({"Favorable", "Heavy", "Parafunction"})
+VALID_PARAFUNCTION: FrozenSet[str] = frozenset({"none", "mild", "moderate", "severe"})
+VALID_OPPOSING: FrozenSet[str] = frozenset({"natural", "complete_denture", "implant_supported", "mixed"})
+_SPAN_TYPES = ("BOUNDED", "DISTAL_EXTENSION")
 
 
 def _require(condition: bool, msg: str):
@@ -49,29 +50,44 @@ def validate_case_payload(payload: Dict[str, Any]) -> NormalizedPayload:
     _require(pr.get("opposing_dentition") in VALID_OPPOSING, "Invalid opposing_dentition")
 
     spans_by_arch: Dict[str, List[NormalizedSpan]] = {"maxilla": [], "mandible": []}
+    spans_in = payload["spans"]
     for arch in ("maxilla", "mandible"):
-        for rec in payload["spans"].get(arch, []):
-            # basic shape checks (from your SpanRecord in span_detector.py)
-            _require(isinstance(rec.get("missing_teeth"), list) and rec["missing_teeth"], f"{arch}: span missing_teeth required")
-            _require(rec.get("span_type") in ("BOUNDED", "DISTAL_EXTENSION"), f"{arch}: invalid span_type")
-            _require(isinstance(rec.get("abutments"), dict), f"{arch}: abutments required")
-            _require(isinstance(rec.get("outside_abutments"), dict), f"{arch}: outside_abutments required")
-            _require(isinstance(rec.get("cross_midline"), bool), f"{arch}: cross_midline required")
+        out = spans_by_arch[arch]
+        for rec in spans_in.get(arch, []):
+            # basic shape checks (from your SpanRecord in span_detector.py);
+            # inlined so error messages are only formatted on failure
+            get = rec.get
+            span_id = get("span_id")
+            if not isinstance(span_id, str):
+                raise ValueError(f"{arch}: span_id required")
+            missing_teeth = get("missing_teeth")
+            if not (isinstance(missing_teeth, list) and missing_teeth):
+                raise ValueError(f"{arch}: span missing_teeth required")
+            span_type = get("span_type")
+            if span_type not in _SPAN_TYPES:
+                raise ValueError(f"{arch}: invalid span_type")
+            abutments = get("abutments")
+            if not isinstance(abutments, dict):
+                raise ValueError(f"{arch}: abutments required")
+            outside_abutments = get("outside_abutments")
+            if not isinstance(outside_abutments, dict):
+                raise ValueError(f"{arch}: outside_abutments required")
+            cross_midline = get("cross_midline")
+            if not isinstance(cross_midline, bool):
+                raise ValueError(f"{arch}: cross_midline required")
 
-            length = len(rec["missing_teeth"])
-            pontic_tooth = rec["missing_teeth"][0] if length == 1 else None
-
-            spans_by_arch[arch].append({
-                "span_id": rec["span_id"],
+            length = len(missing_teeth)
+            out.append({
+                "span_id": span_id,
                 "arch": arch,
-                "missing_teeth": rec["missing_teeth"],
-                "abutments": rec["abutments"],
-                "outside_abutments": rec["outside_abutments"],
-                "span_type": rec["span_type"],
-                "cross_midline": rec["cross_midline"],
-                "pier_abutments": rec.get("pier_abutments", []),
+                "missing_teeth": missing_teeth,
+                "abutments": abutments,
+                "outside_abutments": outside_abutments,
+                "span_type": span_type,
+                "cross_midline": cross_midline,
+                "pier_abutments": get("pier_abutments", []),
                 "length": length,
-                "pontic_tooth": pontic_tooth,
+                "pontic_tooth": missing_teeth[0] if length == 1 else None,
             })
 
     return {
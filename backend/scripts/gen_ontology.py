@@ -0,0 +1,122 @@
+# scripts/gen_ontology.py
+"""
+Generate backend/ontology_data.py from data/ontology.db.
+
+Re-run whenever ontology.db changes and commit the result:
+    python scripts/gen_ontology.py          # rewrite ontology_data.py
+    python scripts/gen_ontology.py --check  # exit 1 if the snapshot is stale
+"""
+import sqlite3
+import sys
+from pathlib import Path
+from pprint import pformat
+from typing import Any, Dict
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+OUT_PATH = BACKEND_DIR / "ontology_data.py"
+
+HEADER = '''\
+# ontology_data.py
+# GENERATED by scripts/gen_ontology.py from data/ontology.db -- do not edit by hand.
+from typing import Any, Dict
+
+'''
+
+DB_PATH = BACKEND_DIR / "data" / "ontology.db"
+
+# One compound statement for every keyed table: (tag, key, c1, c2, c3, c4).
+# Unused columns are padded with NULL so the result set has a single shape.
+_ONTOLOGY_SQL = """
+SELECT 'arch', key, label, NULL, NULL, NULL FROM arch_labels
+UNION ALL SELECT 'span_type', key, label, NULL, NULL, NULL FROM span_type_labels
+UNION ALL SELECT 'families', key, label, short, description, NULL FROM families
+UNION ALL SELECT 'kinds', key, label, short, description, NULL FROM kinds
+UNION ALL SELECT 'rules', key, short, label, explanation, severity FROM rules
+UNION ALL SELECT 'plans', key, label, description, NULL, NULL FROM plans
+UNION ALL SELECT 'severityTokens', severity, token, NULL, NULL, NULL FROM ui_severity_tokens
+UNION ALL SELECT 'legend', key, value, NULL, NULL, NULL FROM ui_legend
+UNION ALL SELECT 'glossary', key, text, NULL, NULL, NULL FROM glossary
+UNION ALL SELECT 'options', key, label, short, description, nameTemplate FROM options
+"""
+
+def _connect() -> sqlite3.Connection:
+    """Read-only connection (never creates a missing DB file)."""
+    return sqlite3.connect(f"{DB_PATH.resolve().as_uri()}?mode=ro", uri=True)
+
+def load_ontology_from_db() -> Dict[str, Any]:
+    """
+    Read the ontology dictionary from the SQLite database.
+    Engine/ruleset versions are not part of the DB; ontology_layer.get_ontology() adds them.
+    """
+    conn = _connect()
+    cur = conn.cursor()
+
+    # --- meta ---
+    cur.execute("SELECT version, locale, updated_at FROM meta LIMIT 1")
+    version, locale, updated_at = cur.fetchone()
+    meta = {
+        "version": version,
+        "locale": locale,
+        "updated_at": updated_at,
+    }
+
+    # --- everything else: one pass, dispatch on tag ---
+    tables: Dict[str, Dict[str, Any]] = {
+        "arch": {}, "span_type": {}, "families": {}, "kinds": {},
+        "rules": {}, "plans": {}, "severityTokens": {}, "legend": {},
+        "glossary": {}, "options": {},
+    }
+    for tag, key, c1, c2, c3, c4 in cur.execute(_ONTOLOGY_SQL).fetchall():
+        if tag in ("families", "kinds"):
+            value: Any = {"label": c1, "short": c2, "description": c3}
+        elif tag == "rules":
+            value = {"short": c1, "label": c2, "explanation": c3, "severity": c4}
+        elif tag == "plans":
+            value = {"label": c1, "description": c2}
+        elif tag == "options":
+            value = {"label": c1, "short": c2, "description": c3, "nameTemplate": c4}
+        else:
+            value = c1
+        tables[tag][key] = value
+    conn.close()
+
+    return {
+        "meta": meta,
+        "labels": {
+            "arch": tables["arch"],
+            "span_type": tables["span_type"],
+            "families": tables["families"],
+            "kinds": tables["kinds"],
+        },
+        "rules": tables["rules"],
+        "plans": tables["plans"],
+        "ui": {
+            "severityTokens": tables["severityTokens"],
+            "legend": tables["legend"],
+        },
+        "glossary": tables["glossary"],
+        "options": tables["options"],
+    }
+
+
+def render() -> str:
+    body = pformat(load_ontology_from_db(), indent=1, width=100, sort_dicts=False)
+    return f"{HEADER}ONTOLOGY: Dict[str, Any] = (\n{body}\n)\n"
+
+
+def main(argv: list) -> int:
+    text = render()
+    if "--check" in argv:
+        current = OUT_PATH.read_text(encoding="utf-8") if OUT_PATH.exists() else ""
+        if current != text:
+            print(f"{OUT_PATH.name} is out of date; run scripts/gen_ontology.py")
+            return 1
+        print(f"{OUT_PATH.name} is up to date")
+        return 0
+    OUT_PATH.write_text(text, encoding="utf-8")
+    print(f"wrote {OUT_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,5 @@
 # span_detector.py
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional, Set, Tuple
+from typing import List, Dict, Optional, Tuple, FrozenSet, TypedDict
 
 # ---------------------------------------------------------------------
 # Canonical FDI order (right→left for each arch, patient perspective)
@@ -10,18 +9,24 @@ from typing import List, Dict, Optional, Set, Tuple
 UPPER: List[str] = [str(n) for n in range(18, 10, -1)] + [str(n) for n in range(21, 29)]
 LOWER: List[str] = [str(n) for n in range(48, 40, -1)] + [str(n) for n in range(31, 39)]
 
-VALID_TEETH: Set[str] = set(UPPER + LOWER)
+VALID_TEETH: FrozenSet[str] = frozenset(UPPER + LOWER)
 
 ARCH_INDEX: Dict[str, List[str]] = {
     "maxilla": UPPER,
     "mandible": LOWER,
 }
 
+ARCH_SET: Dict[str, FrozenSet[str]] = {arch: frozenset(order) for arch, order in ARCH_INDEX.items()}
+
+# tooth -> index in its arch order (fixed; built once at import)
+POS: Dict[str, Dict[str, int]] = {
+    arch: {t: i for i, t in enumerate(order)} for arch, order in ARCH_INDEX.items()
+}
+
 # ---------------------------------------------------------------------
 # Data model
 # ---------------------------------------------------------------------
-@dataclass(frozen=True)
-class SpanRecord:
+class SpanRecord(TypedDict):
     span_id: str
     arch: str                                 # "maxilla" | "mandible"
     missing_teeth: List[str]                  # consecutive in arch order
@@ -34,26 +39,27 @@ class SpanRecord:
 # ---------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------
-def detect_spans_and_abutments(missing_teeth: List[str]) -> Dict[str, List[Dict]]:
+def detect_spans_and_abutments(missing_teeth: List[str]) -> Dict[str, List[SpanRecord]]:
     """
     Validate input, compute spans (consecutive runs), infer abutments, classify span types,
     detect pier abutments adjacent to each span, and return:
-        {"maxilla":[SpanRecord-as-dict...], "mandible":[...]}
+        {"maxilla":[SpanRecord...], "mandible":[...]}
     """
     clean_missing = _normalize_and_validate(missing_teeth)
 
+    # Teeth are validated FDI codes, so scanning each fixed arch order against
+    # the missing set yields each arch's missing teeth already in arch order
+    missing_set = set(clean_missing)
     by_arch_missing = {
-        "maxilla": sorted([t for t in clean_missing if t in UPPER], key=_order_key("maxilla")),
-        "mandible": sorted([t for t in clean_missing if t in LOWER], key=_order_key("mandible")),
+        arch: [t for t in order if t in missing_set] for arch, order in ARCH_INDEX.items()
     }
 
-    results: Dict[str, List[Dict]] = {"maxilla": [], "mandible": []}
+    results: Dict[str, List[SpanRecord]] = {"maxilla": [], "mandible": []}
 
     for arch in ("maxilla", "mandible"):
-        arch_order = ARCH_INDEX[arch]
         missing_in_arch = by_arch_missing[arch]
-        present: Set[str] = set(arch_order) - set(missing_in_arch)
-        runs = _find_consecutive_runs(missing_in_arch, arch_order)
+        present: FrozenSet[str] = ARCH_SET[arch].difference(missing_in_arch)
+        runs = _find_consecutive_runs(missing_in_arch, arch)
 
         for idx, run in enumerate(runs, start=1):
             (
@@ -62,31 +68,20 @@ def detect_spans_and_abutments(missing_teeth: List[str]) -> Dict[str, List[Dict]
                 outside_left,
                 outside_right,
                 cross_midline,
-            ) = _infer_abutments_for_run(run, arch)
-
-            # Keep only abutments that are actually present teeth
-            mesial_abut = mesial_abut if (mesial_abut and mesial_abut in present) else None
-            distal_abut = distal_abut if (distal_abut and distal_abut in present) else None
-            outside_left = outside_left if (outside_left and outside_left in present) else None
-            outside_right = outside_right if (outside_right and outside_right in present) else None
-
-            span_type = _classify_span_type(
-                mesial_abut, distal_abut, outside_left, outside_right, cross_midline
-            )
-
-            pier_abutments = _find_piers_touching_run(run, arch, missing_in_arch, present)
-
-            rec = SpanRecord(
-                span_id=f"{'Mx' if arch == 'maxilla' else 'Md'}-{idx}",
-                arch=arch,
-                missing_teeth=run,
-                abutments={"mesial": mesial_abut, "distal": distal_abut},
-                outside_abutments={"left": outside_left, "right": outside_right},
-                span_type=span_type,
-                cross_midline=cross_midline,
-                pier_abutments=pier_abutments,
-            )
-            results[arch].append(asdict(rec))
+                span_type,
+                pier_abutments,
+            ) = _analyze_run(run, arch, present)
+
+            results[arch].append({
+                "span_id": f"{'Mx' if arch == 'maxilla' else 'Md'}-{idx}",
+                "arch": arch,
+                "missing_teeth": run,
+                "abutments": {"mesial": mesial_abut, "distal": distal_abut},
+                "outside_abutments": {"left": outside_left, "right": outside_right},
+                "span_type": span_type,
+                "cross_midline": cross_midline,
+                "pier_abutments": pier_abutments,
+            })
 
     return results
 
@@ -96,91 +91,103 @@ def detect_spans_and_abutments(missing_teeth: List[str]) -> Dict[str, List[Dict]
 def _normalize_and_validate(missing_teeth: List[str]) -> List[str]:
     if not isinstance(missing_teeth, list):
         raise TypeError("missing_teeth must be a list of tooth codes (strings).")
-    norm = [str(t).strip() for t in missing_teeth if str(t).strip()]
-    seen = set()
-    unique: List[str] = []
-    for t in norm:
-        if t not in seen:
-            seen.add(t)
-            unique.append(t)
-    invalid = [t for t in unique if t not in VALID_TEETH]
-    if invalid:
+    # Strip once per tooth; dict.fromkeys de-dups while keeping first-seen order
+    unique: List[str] = list(dict.fromkeys(s for s in (str(t).strip() for t in missing_teeth) if s))
+    if not VALID_TEETH.issuperset(unique):
+        invalid = [t for t in unique if t not in VALID_TEETH]
         raise ValueError(f"Invalid tooth codes: {invalid}")
     return unique
 
-def _order_key(arch: str):
-    order = ARCH_INDEX[arch]
-    pos = {t: i for i, t in enumerate(order)}
-    return lambda tooth: pos[tooth]
-
-def _find_consecutive_runs(sorted_missing: List[str], arch_order: List[str]) -> List[List[str]]:
+def _find_consecutive_runs(sorted_missing: List[str], arch: str) -> List[List[str]]:
     if not sorted_missing:
         return []
-    pos = {t: i for i, t in enumerate(arch_order)}
+    # Map to arch indices once, find the run boundaries on ints, then slice
+    idx = list(map(POS[arch].__getitem__, sorted_missing))
     runs: List[List[str]] = []
-    current: List[str] = [sorted_missing[0]]
-    for prev, curr in zip(sorted_missing, sorted_missing[1:]):
-        if pos[curr] == pos[prev] + 1:
-            current.append(curr)
-        else:
-            runs.append(current)
-            current = [curr]
-    runs.append(current)
+    start = 0
+    for k in range(1, len(idx)):
+        if idx[k] != idx[k - 1] + 1:
+            runs.append(sorted_missing[start:k])
+            start = k
+    runs.append(sorted_missing[start:])
     return runs
 
+# c_left is the last tooth on the right side (index pivot). (11 or 41)
+_CENTRALS_BY_ARCH: Dict[str, Tuple[str, str]] = {"maxilla": ("11", "21"), "mandible": ("41", "31")}
+
 def _central_codes(arch: str) -> Tuple[str, str]:
-    # c_left is the last tooth on the right side (index pivot). (11 or 41)
-    return ("11", "21") if arch == "maxilla" else ("41", "31")
+    return _CENTRALS_BY_ARCH[arch]
 
-def _infer_abutments_for_run(
+# Index of c_left per arch: the midline seam lies between it and the next index
+_PIVOT: Dict[str, int] = {arch: POS[arch][c[0]] for arch, c in _CENTRALS_BY_ARCH.items()}
+
+def _analyze_run(
     run: List[str],
     arch: str,
-) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str], bool]:
+    present: FrozenSet[str],
+) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str], bool, str, List[str]]:
     """
-    Compute outside neighbors, then assign mesial/distal relative to midline pivot.
-    Returns: (mesial, distal, outside_left, outside_right, cross_midline)
-      - 'left'  = neighbor BEFORE the first missing tooth in arch order (viewer left)
-      - 'right' = neighbor AFTER  the last  missing tooth in arch order (viewer right)
+    Walk one run once and derive everything the span record needs: outside
+    neighbors, mesial/distal abutments relative to the midline pivot, span type
+    and the pier abutments touching the run.
+    Returns: (mesial, distal, outside_left, outside_right, cross_midline, span_type, piers)
+      - 'right' = neighbor BEFORE the first missing tooth in arch order
+      - 'left'  = neighbor AFTER  the last  missing tooth in arch order
     If run includes BOTH centrals, mesial/distal are None (still return outside neighbors).
+    Abutments/neighbors are only reported when they are present teeth.
     """
     arch_order = ARCH_INDEX[arch]
-    pos = {t: i for i, t in enumerate(arch_order)}
+    n = len(arch_order)
+    pos = POS[arch]
     first_i, last_i = pos[run[0]], pos[run[-1]]
 
     left_idx = first_i - 1
     right_idx = last_i + 1
-    outside_right = arch_order[left_idx] if 0 <= left_idx < len(arch_order) else None
-    outside_left = arch_order[right_idx] if 0 <= right_idx < len(arch_order) else None
+    outside_right = arch_order[left_idx] if 0 <= left_idx < n else None
+    outside_left = arch_order[right_idx] if 0 <= right_idx < n else None
 
     c_left, c_right = _central_codes(arch)
-    pivot = pos[c_left]  # seam is between pivot and pivot+1
+    pivot = _PIVOT[arch]  # seam is between pivot and pivot+1
     cross_midline = (c_left in run and c_right in run)
     if cross_midline:
-        return None, None, outside_left, outside_right, True
-
-    run_indices = [pos[t] for t in run]
-    entirely_right = max(run_indices) <= pivot       # Q1 (upper) / Q4 (lower)
-    entirely_left  = min(run_indices) >= pivot + 1   # Q2 (upper) / Q3 (lower)
-
-    if entirely_right:
-        mesial = outside_left   # toward midline
+        mesial, distal = None, None
+    # run is in arch order, so first_i/last_i are its min/max indices
+    elif last_i <= pivot:           # entirely right: Q1 (upper) / Q4 (lower)
+        mesial = outside_left       # toward midline
         distal = outside_right
-    elif entirely_left:
+    elif first_i >= pivot + 1:      # entirely left: Q2 (upper) / Q3 (lower)
         mesial = outside_right
         distal = outside_left
     else:
         # Near-midline (touches a central but not both) — keep outward neighbors and
-        # treat the one nearer the seam as mesial.
-        def dist_to_seam(idx: Optional[int]) -> float:
-            if idx is None:
-                return float("inf")
-            return abs((pivot + 0.5) - idx)
-
-        mesial, distal = outside_left, outside_right
-        if dist_to_seam(right_idx) < dist_to_seam(left_idx):
+        # treat the one nearer the seam as mesial (both indices are ints here).
+        seam = pivot + 0.5
+        if abs(seam - right_idx) < abs(seam - left_idx):
             mesial, distal = outside_right, outside_left
+        else:
+            mesial, distal = outside_left, outside_right
 
-    return mesial, distal, outside_left, outside_right, False
+    # Keep only abutments that are actually present teeth
+    mesial = mesial if (mesial and mesial in present) else None
+    distal = distal if (distal and distal in present) else None
+    outside_left = outside_left if (outside_left and outside_left in present) else None
+    outside_right = outside_right if (outside_right and outside_right in present) else None
+
+    span_type = _classify_span_type(mesial, distal, outside_left, outside_right, cross_midline)
+
+    # Pier abutments: a present outside neighbor with missing teeth on BOTH sides
+    # (arch teeth are either present or missing, so "missing" == not in present).
+    piers: List[str] = []
+    for i in (left_idx, right_idx):
+        if not 0 <= i < n:
+            continue
+        tooth = arch_order[i]
+        if tooth not in present:
+            continue
+        if 0 <= i - 1 and i + 1 < n and arch_order[i - 1] not in present and arch_order[i + 1] not in present:
+            piers.append(tooth)
+
+    return mesial, distal, outside_left, outside_right, cross_midline, span_type, piers
 
 def _classify_span_type(
     mesial_abut: Optional[str],
@@ -195,49 +202,6 @@ def _classify_span_type(
         return "BOUNDED"
     return "DISTAL_EXTENSION"
 
-def _find_piers_touching_run(
-    run: List[str],
-    arch: str,
-    missing_in_arch: List[str],
-    present_in_arch: Set[str],
-) -> List[str]:
-    """
-    Detect pier abutments that directly 'touch' this run.
-    A tooth is a pier abutment if it is present AND it has missing neighbors on BOTH sides.
-    We only return those pier teeth that are immediately adjacent to this run (left or right outside neighbors).
-    """
-    arch_order = ARCH_INDEX[arch]
-    pos = {t: i for i, t in enumerate(arch_order)}
-    missing_set = set(missing_in_arch)
-    piers: List[str] = []
-
-    # candidates: the immediate outside neighbors of the run
-    first_i, last_i = pos[run[0]], pos[run[-1]]
-    left_idx = first_i - 1
-    right_idx = last_i + 1
-    candidates = []
-    if 0 <= left_idx < len(arch_order):
-        candidates.append(arch_order[left_idx])
-    if 0 <= right_idx < len(arch_order):
-        candidates.append(arch_order[right_idx])
-
-    for tooth in candidates:
-        if tooth not in present_in_arch:
-            continue
-        i = pos[tooth]
-        q = int(tooth[0])
-        # Mesial direction: +1 step for Q1/Q4, -1 for Q2/Q3 (toward midline)
-        mesial_step = +1 if q in (1, 4) else -1
-        distal_step = -mesial_step
-        mi, di = i + mesial_step, i + distal_step
-        has_mesial_gap = (0 <= mi < len(arch_order)) and (arch_order[mi] in missing_set)
-        has_distal_gap = (0 <= di < len(arch_order)) and (arch_order[di] in missing_set)
-        if has_mesial_gap and has_distal_gap:
-            piers.append(tooth)
-
-    # Return unique (at most two by construction)
-    return list(dict.fromkeys(piers))
-
 # ---------------------------------------------------------------------
 # CLI test
 # ---------------------------------------------------------------------